@@ -16,6 +16,8 @@ from app.services.chunker import (
     _normalize_text,
 )
 
+_MIME = magic.Magic(mime=True)
+
 router = APIRouter(
     prefix="/debug/chunker",
     tags=["DEBUG – Chunker"]
@@ -41,7 +43,7 @@ async def debug_chunker(
     """
 
     file_bytes = await file.read()
-    content_type = magic.Magic(mime=True).from_buffer(file_bytes)
+    content_type = _MIME.from_buffer(file_bytes)
 
     # -------------------------------------------------------
     # STEP 1 – TEXT / OCR
@@ -67,7 +69,8 @@ async def debug_chunker(
             "text": ocr_res.get("text", "")
         }]
 
-    else:
+    # бинарник не декодируем целиком в строку
+    elif content_type.startswith("text/") or file.filename.lower().endswith(".txt"):
         try:
             text = file_bytes.decode("utf-8")
         except:
@@ -78,6 +81,14 @@ async def debug_chunker(
             "text": text
         }]
 
+    else:
+        return {
+            "pages_detected": 0,
+            "total_chunks": 0,
+            "chunks": [],
+            "error": f"unsupported content_type: {content_type}",
+        }
+
     # -------------------------------------------------------
     # STEP 2 — SIMPLE sentence chunker (chunk_by_sentences)
     # -------------------------------------------------------
@@ -6,6 +6,7 @@ import tempfile
 
 from app.db import get_db
 from app.services.ingest_service import process_any_file
+from app.services.chunker import enqueue_file_vectorization
 from app.db.models import File as DBFile        # ← ВАЖНО: переименовали!
 from app.storage.s3_client import upload_to_s3
 
@@ -63,6 +64,8 @@ async def debug_ingest(
         file_id=file_id,
         db=db
     )
+    db.commit()
+    enqueue_file_vectorization(db, file_id)
 
     # -----------------------------------------
     # 5. Удаляем временный файл
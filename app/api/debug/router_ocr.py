@@ -9,11 +9,16 @@ from io import BytesIO
 from PIL import Image
 
 from app.services.ocr_worker import (
-    run_tesseract_ocr,
+    OCR_RENDER_BATCH,
+    ocr_pdf_pages,
+    open_pdf_reader,
+    pdf_page_count,
     run_tesseract_ocr_image,
 )
 from app.services.ocr_corrector import correct_ocr_text
 
+_MIME = magic.Magic(mime=True)
+
 router = APIRouter(prefix="/debug/ocr", tags=["DEBUG - OCR"])
 
 
@@ -28,7 +33,7 @@ async def debug_ocr(file: UploadFile = File(...)) -> Dict[str, Any]:
     """
 
     file_bytes = await file.read()
-    content_type = magic.Magic(mime=True).from_buffer(file_bytes)
+    content_type = _MIME.from_buffer(file_bytes)
     pages: List[Dict[str, Any]] = []
 
     # =====================================================
@@ -42,29 +47,43 @@ async def debug_ocr(file: UploadFile = File(...)) -> Dict[str, Any]:
 
         try:
             max_pages = 50
-            empty_streak = 0
 
-            for page_num in range(1, max_pages + 1):
+            try:
+                with open_pdf_reader(pdf_path) as reader:
+                    total_pages = min(pdf_page_count(reader), max_pages)
+            except Exception:
+                # PyPDF2 не разобрал файл — пусть Poppler попробует сам
+                total_pages = max_pages
+
+            # окнами по OCR_RENDER_BATCH страниц: окно рендерится одним
+            # проходом Poppler и OCR-ится параллельно. Как и раньше, на первой
+            # пустой странице останавливаемся — следующие окна не рендерим
+            stop = False
+            for first in range(1, total_pages + 1, OCR_RENDER_BATCH):
+                last = min(first + OCR_RENDER_BATCH - 1, total_pages)
+                ocr_pages = ocr_pdf_pages(pdf_path, range(first, last + 1))
+
+                for page_num in range(first, last + 1):
 
-                raw_text = run_tesseract_ocr(pdf_path, page_num=page_num)
+                    raw_text = ocr_pages.get(page_num, "")
 
-                if not raw_text or not raw_text.strip():
-                    empty_streak += 1
-                    if empty_streak >= 1:
+                    if not raw_text or not raw_text.strip():
+                        stop = True
                         break
-                    continue
-
-                empty_streak = 0
-                corrected = correct_ocr_text(raw_text)
-
-                pages.append(
-                    {
-                        "page": page_num,
-                        "raw_text": raw_text,
-                        "text": corrected,
-                        "conf": None,
-                    }
-                )
+
+                    corrected = correct_ocr_text(raw_text)
+
+                    pages.append(
+                        {
+                            "page": page_num,
+                            "raw_text": raw_text,
+                            "text": corrected,
+                            "conf": None,
+                        }
+                    )
+
+                if stop:
+                    break
         finally:
             try:
                 os.remove(pdf_path)
@@ -91,7 +110,8 @@ async def debug_ocr(file: UploadFile = File(...)) -> Dict[str, Any]:
     # =====================================================
     # 3. TEXT FILE (.txt)
     # =====================================================
-    else:
+    # бинарник не декодируем целиком в строку и не шлём в LLM-корректор
+    elif content_type.startswith("text/") or file.filename.lower().endswith(".txt"):
         try:
             raw_text = file_bytes.decode("utf-8", errors="ignore")
         except Exception:
@@ -108,6 +128,14 @@ async def debug_ocr(file: UploadFile = File(...)) -> Dict[str, Any]:
             }
         )
 
+    else:
+        return {
+            "pages": [],
+            "total_pages": 0,
+            "avg_confidence": None,
+            "error": f"unsupported content_type: {content_type}",
+        }
+
     return {
         "pages": pages,
         "total_pages": len(pages),
@@ -32,6 +32,7 @@ from app.utils.config import settings
 
 # ✅ ИСПРАВЛЕНИЕ: Используем ingest_service напрямую вместо Celery task
 from app.services.ingest_service import process_any_file
+from app.services.chunker import enqueue_file_vectorization
 
 # ============================================================
 # Константы
@@ -277,6 +278,7 @@ async def upload_files(
                                 # Обновляем запись File с количеством чанков
                                 new_file.chunks_count = chunks_created
                                 db.commit()
+                                enqueue_file_vectorization(db, inner_file_id)
                                 
                             except Exception as ocr_err:
                                 logger.error(f"  ❌ Ошибка обработки файла: {ocr_err}")
@@ -358,6 +360,7 @@ async def upload_files(
                         # Обновляем запись
                         new_file.chunks_count = chunks_created
                         db.commit()
+                        enqueue_file_vectorization(db, file_id)
                         
                     except Exception as ocr_err:
                         logger.error(f"❌ Ошибка OCR: {ocr_err}")
@@ -425,6 +428,7 @@ async def upload_files(
                         # Обновляем запись
                         new_file.chunks_count = chunks_created
                         db.commit()
+                        enqueue_file_vectorization(db, file_id)
                         
                     except Exception as ocr_err:
                         logger.error(f"❌ Ошибка обработки: {ocr_err}")
@@ -1,7 +1,7 @@
 # app/search/vector_client.py
 
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 import weaviate
 
@@ -9,6 +9,8 @@ from app.utils.config import settings
 
 logger = logging.getLogger("VECTOR-CLIENT")
 
+CHUNK_PROPERTIES = ["file_id", "page", "chunk_id", "text"]
+
 _vector_client_singleton = None
 
 
@@ -141,11 +143,23 @@ class VectorClient:
     # SEARCH
     # ===================================================================================
 
-    def search(self, query_text: str, limit: int = 10, with_vector: bool = False) -> Dict[str, Any]:
+    def search(
+        self,
+        query_text: str,
+        limit: int = 10,
+        with_vector: bool = False,
+        properties: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        properties=[] — не тянуть поля объекта (например, когда нужен
+        только _additional.vector): ответ без текстов чанков в разы меньше.
+        """
+        if properties is None:
+            properties = CHUNK_PROPERTIES
         try:
             q = (
                 self.client.query
-                .get("Chunk", ["file_id", "page", "chunk_id", "text"])
+                .get("Chunk", properties)
                 .with_near_text({"concepts": [query_text]})
                 .with_limit(limit)
             )
@@ -159,3 +173,35 @@ class VectorClient:
         except Exception as e:
             logger.error(f"❌ search error: {e}")
             return {}
+
+    def search_many(
+        self,
+        query_texts: List[str],
+        limit: int = 1,
+        with_vector: bool = False,
+        properties: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Несколько near_text-запросов одним GraphQL-запросом.
+        Запрос i приходит под alias "q{i}":
+        {"data": {"Get": {"q0": [...], "q1": [...]}}}
+        Ошибки не глотает — вызывающий сам решает, делать ли fallback.
+        """
+        if properties is None:
+            properties = CHUNK_PROPERTIES
+        additional = ["vector", "distance"] if with_vector else None
+        builders = []
+
+        for i, text in enumerate(query_texts):
+            q = (
+                self.client.query
+                .get("Chunk", properties)
+                .with_near_text({"concepts": [text]})
+                .with_limit(limit)
+                .with_alias(f"q{i}")
+            )
+            if additional:
+                q = q.with_additional(additional)
+            builders.append(q)
+
+        return self.client.query.multi_get(builders).do()
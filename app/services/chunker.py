@@ -5,17 +5,24 @@
 import os
 import re
 import uuid
+import queue
 import logging
-from typing import Optional, List, Dict, Any
+import threading
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Tuple
 
 from sqlalchemy.orm import Session
-from PyPDF2 import PdfReader
+from celery import group
 from transformers import GPT2TokenizerFast
 
 from app.db.models import Chunk
 from app.services.ocr_worker import (
     extract_text_from_pdf,
-    run_tesseract_ocr,
+    ocr_pdf_pages,
+    pdf_page_count,
+    has_enough_text,
+    open_pdf_reader,
+    page_ocr_dpi,
 )
 from app.services.parser import extract_text_from_file
 from app.utils.config import settings
@@ -28,9 +35,25 @@ logger = logging.getLogger("CHUNKER7")
 # 🔧 UUID safety
 # =====================================================================
 
+@lru_cache(maxsize=1024)
+def _uuid_cached(value: str) -> uuid.UUID:
+    return uuid.UUID(value)
+
+
+def _uuid_block(n: int) -> List[uuid.UUID]:
+    """
+    n случайных UUID4 из одного os.urandom (вместо системного вызова
+    на каждый uuid.uuid4()); version/variant выставляет uuid.UUID.
+    """
+    raw = os.urandom(16 * n)
+    return [uuid.UUID(bytes=raw[i:i + 16], version=4) for i in range(0, 16 * n, 16)]
+
+
 def ensure_uuid(value) -> Optional[uuid.UUID]:
+    if isinstance(value, uuid.UUID):
+        return value
     try:
-        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+        return _uuid_cached(str(value))
     except Exception:
         logger.error(f"❌ Некорректный UUID: {value}")
         return None
@@ -40,12 +63,9 @@ def ensure_uuid(value) -> Optional[uuid.UUID]:
 # 🔧 Normalization
 # =====================================================================
 
-def _normalize_text(text: str) -> str:
-    if not text:
-        return ""
-    t = text.replace("\r", "")
-
-    garbage = [
+_GARBAGE_RES = [
+    re.compile(g, re.IGNORECASE)
+    for g in (
         r"©\s?Все права защищены.*",
         r"сканировано\s?с\s?помощью.*",
         r"страница\s*\d+\s*из\s*\d+.*",
@@ -54,12 +74,22 @@ def _normalize_text(text: str) -> str:
         r"электронный документ.*",
         r"Просмотрено.*",
         r"Дата печати.*",
-    ]
-    for g in garbage:
-        t = re.sub(g, "", t, flags=re.IGNORECASE)
+    )
+]
+_SPACES_RE = re.compile(r"[ \t]+")
+_MANY_NEWLINES_RE = re.compile(r"\n{3,}")
+
 
-    t = re.sub(r"[ \t]+", " ", t)
-    t = re.sub(r"\n{3,}", "\n\n", t)
+def _normalize_text(text: str) -> str:
+    if not text:
+        return ""
+    t = text.replace("\r", "")
+
+    for rx in _GARBAGE_RES:
+        t = rx.sub("", t)
+
+    t = _SPACES_RE.sub(" ", t)
+    t = _MANY_NEWLINES_RE.sub("\n\n", t)
     return t.strip()
 
 
@@ -74,13 +104,14 @@ SECTION_PATTERNS = {
     "obiasnenie": r"(ОБЪЯСНЕНИЕ|Объяснение)",
     "prilojenie": r"(ПРИЛОЖЕНИЕ|Приложение)",
 }
+_SECTION_RES = {k: re.compile(p, re.IGNORECASE) for k, p in SECTION_PATTERNS.items()}
 
 
 def detect_section(text: str) -> str:
     if not text:
         return "unknown"
-    for section, pattern in SECTION_PATTERNS.items():
-        if re.search(pattern, text, re.IGNORECASE):
+    for section, rx in _SECTION_RES.items():
+        if rx.search(text):
             return section
     return "unknown"
 
@@ -98,6 +129,26 @@ def split_sentences(text: str) -> List[str]:
     return split_into_sentences(text)
 
 
+_DATE_RE = re.compile(r"\d{2}\.\d{2}\.\d{4}")
+_DATE_WORD_RE = re.compile(r"\b\d{2}\.\d{2}\.\d{4}\b")
+_AMOUNT_RE = re.compile(r"\d{2,3}\s?\d{3}")
+_AMOUNT_WORD_RE = re.compile(r"\b\d{2,3}\s?\d{3}\b")
+_ROLE_RE = re.compile(
+    r"(потерпевш\w+|подозреваем\w+|заявител\w+|свидетел\w+|граждан\w+)",
+    re.IGNORECASE,
+)
+_PERSON_RE = re.compile(
+    r"\b(потерпевш\w*|подозреваем\w*|заявител\w*|свидетел\w*|граждан\w*)\b",
+    re.IGNORECASE,
+)
+_AMOUNT_CURRENCY_RE = re.compile(
+    r"\b\d{2,3}\s?\d{3}(?:\s?(?:тг|тенге|KZT))?\b",
+    re.IGNORECASE,
+)
+_PHONE_RE = re.compile(r"\+?\d{10,15}")
+_CARD_RE = re.compile(r"\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b")
+
+
 def build_slg_groups(sentences: List[str]) -> List[List[str]]:
     groups: List[List[str]] = []
     current: List[str] = []
@@ -109,13 +160,9 @@ def build_slg_groups(sentences: List[str]) -> List[List[str]]:
             current = []
 
     for sent in sentences:
-        has_date = re.search(r"\d{2}\.\d{2}\.\d{4}", sent)
-        has_amount = re.search(r"\d{2,3}\s?\d{3}", sent)
-        role = re.search(
-            r"(потерпевш\w+|подозреваем\w+|заявител\w+|свидетел\w+|граждан\w+)",
-            sent,
-            flags=re.IGNORECASE,
-        )
+        has_date = _DATE_RE.search(sent)
+        has_amount = _AMOUNT_RE.search(sent)
+        role = _ROLE_RE.search(sent)
 
         if current and (has_date or has_amount or role):
             flush()
@@ -136,34 +183,11 @@ def extract_entities(text: str) -> Dict[str, List[str]]:
         return {"persons": [], "amounts": [], "dates": [], "phones": [], "cards": []}
 
     return {
-        "persons": list(
-            set(
-                re.findall(
-                    r"\b(потерпевш\w*|подозреваем\w*|заявител\w*|свидетел\w*|граждан\w*)\b",
-                    text,
-                    flags=re.IGNORECASE,
-                )
-            )
-        ),
-        "amounts": list(
-            set(
-                re.findall(
-                    r"\b\d{2,3}\s?\d{3}(?:\s?(?:тг|тенге|KZT))?\b",
-                    text,
-                    flags=re.IGNORECASE,
-                )
-            )
-        ),
-        "dates": list(set(re.findall(r"\b\d{2}\.\d{2}\.\d{4}\b", text))),
-        "phones": list(set(re.findall(r"\+?\d{10,15}", text))),
-        "cards": list(
-            set(
-                re.findall(
-                    r"\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b",
-                    text,
-                )
-            )
-        ),
+        "persons": list(set(_PERSON_RE.findall(text))),
+        "amounts": list(set(_AMOUNT_CURRENCY_RE.findall(text))),
+        "dates": list(set(_DATE_WORD_RE.findall(text))),
+        "phones": list(set(_PHONE_RE.findall(text))),
+        "cards": list(set(_CARD_RE.findall(text))),
     }
 
 
@@ -173,25 +197,26 @@ EVENT_MAP = {
     "promise": r"(обещал|обещала|гарантировал|гарантировала|обещание дохода)",
     "fraud": r"(обман|ввел в заблуждение|ввела в заблуждение|мошенничеств\w+)",
 }
+_EVENT_RES = {k: re.compile(p, re.IGNORECASE) for k, p in EVENT_MAP.items()}
 
 
 def extract_events(text: str) -> List[str]:
     if not text:
         return []
     lowered = text.lower()
-    return [event for event, pattern in EVENT_MAP.items() if re.search(pattern, lowered)]
+    return [event for event, rx in _EVENT_RES.items() if rx.search(lowered)]
 
 
 def extract_facts(text: str) -> Dict[str, Any]:
     if not text:
         return {"date": None, "amount": None, "action": None}
 
-    date_m = re.search(r"\b\d{2}\.\d{2}\.\d{4}\b", text)
-    amount_m = re.search(r"\b\d{2,3}\s?\d{3}\b", text)
+    date_m = _DATE_WORD_RE.search(text)
+    amount_m = _AMOUNT_WORD_RE.search(text)
 
     action = None
-    for a, pattern in EVENT_MAP.items():
-        if re.search(pattern, text, re.IGNORECASE):
+    for a, rx in _EVENT_RES.items():
+        if rx.search(text):
             action = a
             break
 
@@ -228,27 +253,42 @@ def count_tokens(text: str) -> int:
     return len(gpt_tokenizer.encode(text)) if text else 0
 
 
-def _split_long_sentence_by_tokens(sentence: str, max_tokens: int) -> List[str]:
-    words = sentence.split()
-    if not words:
+def count_tokens_batch(texts: List[str]) -> List[int]:
+    """Число токенов для списка строк — один вызов fast-токенизатора."""
+    if not texts:
         return []
+    encoded = gpt_tokenizer(texts, add_special_tokens=False)["input_ids"]
+    return [len(ids) for ids in encoded]
 
-    chunks: List[str] = []
-    buf: List[str] = []
-    buf_tokens = 0
 
-    for w in words:
-        wt = count_tokens(w)
-        if buf_tokens + wt > max_tokens and buf:
-            chunks.append(" ".join(buf))
-            buf, buf_tokens = [], 0
-        buf.append(w)
-        buf_tokens += wt
+def _partition_by_tokens(token_counts: List[int], max_tokens: int) -> List[Tuple[int, int]]:
+    """
+    Жадное разбиение последовательности слов по бюджету токенов.
+    Возвращает диапазоны индексов слов [start, end).
+    """
+    ranges: List[Tuple[int, int]] = []
+    start = 0
+    acc = 0
 
-    if buf:
-        chunks.append(" ".join(buf))
+    for i, wt in enumerate(token_counts):
+        if acc + wt > max_tokens and i > start:
+            ranges.append((start, i))
+            start, acc = i, 0
+        acc += wt
 
-    return chunks
+    if start < len(token_counts):
+        ranges.append((start, len(token_counts)))
+
+    return ranges
+
+
+def _split_long_sentence_by_tokens(sentence: str, max_tokens: int) -> List[str]:
+    words = sentence.split()
+    if not words:
+        return []
+
+    ranges = _partition_by_tokens(count_tokens_batch(words), max_tokens)
+    return [" ".join(words[a:b]) for a, b in ranges]
 
 
 def advanced_page_chunker(
@@ -258,8 +298,10 @@ def advanced_page_chunker(
     max_tokens=420,
     min_tokens=60,
     overlap_sentences=1,
+    normalized: bool = False,
 ):
-    text = _normalize_text(page_text)
+    # normalized=True — вызывающий уже прогнал текст через _normalize_text
+    text = page_text.strip() if normalized else _normalize_text(page_text)
     if not text:
         return []
 
@@ -268,13 +310,18 @@ def advanced_page_chunker(
         tok = count_tokens(text)
         return [{"start": 0, "end": len(text), "text": text, "tokens": tok}]
 
+    # токены всех предложений — одним батчем (strip + фильтр за один проход)
+    sentences = [t for t in (s.strip() for s in sentences) if t]
+    sentence_tokens = count_tokens_batch(sentences)
+
     chunks: List[Dict[str, Any]] = []
     cur_sentences: List[str] = []
+    cur_sentence_tokens: List[int] = []
     cur_tokens = 0
     global_offset = 0
 
     def flush():
-        nonlocal cur_sentences, cur_tokens, global_offset
+        nonlocal cur_sentences, cur_sentence_tokens, cur_tokens, global_offset
         if not cur_sentences:
             return
         chunk_text = " ".join(cur_sentences).strip()
@@ -289,22 +336,15 @@ def advanced_page_chunker(
                 }
             )
             global_offset += len(chunk_text) + 1
-        cur_sentences, cur_tokens = [], 0
-
-    for s in sentences:
-        s = s.strip()
-        if not s:
-            continue
-
-        s_tokens = count_tokens(s)
+        cur_sentences, cur_sentence_tokens, cur_tokens = [], [], 0
 
+    for s, s_tokens in zip(sentences, sentence_tokens):
         if s_tokens > max_tokens:
             if cur_sentences:
                 flush()
 
             parts = _split_long_sentence_by_tokens(s, max_tokens)
-            for p in parts:
-                tok = count_tokens(p)
+            for p, tok in zip(parts, count_tokens_batch(parts)):
                 chunks.append(
                     {
                         "start": global_offset,
@@ -317,14 +357,18 @@ def advanced_page_chunker(
             continue
 
         if cur_tokens + s_tokens > max_tokens and cur_sentences:
+            # хвост для overlap берём из только что сброшенных предложений,
+            # без повторного split/токенизации текста чанка
+            flushed, flushed_tokens = cur_sentences, cur_sentence_tokens
             flush()
 
             if overlap_sentences and chunks:
-                tail = split_sentences(chunks[-1]["text"])[-overlap_sentences:]
-                cur_sentences = tail[:]
-                cur_tokens = sum(count_tokens(t) for t in cur_sentences)
+                cur_sentences = flushed[-overlap_sentences:]
+                cur_sentence_tokens = flushed_tokens[-overlap_sentences:]
+                cur_tokens = sum(cur_sentence_tokens)
 
         cur_sentences.append(s)
+        cur_sentence_tokens.append(s_tokens)
         cur_tokens += s_tokens
 
     if cur_sentences:
@@ -338,43 +382,137 @@ def advanced_page_chunker(
     return chunks
 
 
+# =====================================================================
+# 💾 Запись чанков
+# =====================================================================
+
+# сколько строк копим перед одним multi-row INSERT
+CHUNK_INSERT_BATCH = int(getattr(settings, "CHUNK_INSERT_BATCH", 2000) or 2000)
+
+
+def _save_chunk_rows(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Пишет накопленные строки одним bulk_insert_mappings (без ORM-объектов
+    и identity map). Список rows очищается.
+    Векторизацию ставит вызывающий — после commit (enqueue_file_vectorization).
+    """
+    if not rows:
+        return
+
+    db.bulk_insert_mappings(Chunk, rows)
+    rows.clear()
+
+
+def enqueue_file_vectorization(db: Session, file_id) -> int:
+    """
+    Задачи векторизации всех чанков файла — одной группой Celery
+    (одно соединение с брокером). Вызывать после db.commit():
+    воркер читает чанк из БД по chunk_id.
+    Возвращает число поставленных задач.
+    """
+    # только chunk_id, серверным курсором порциями по 500 — без списка строк
+    chunk_ids = (
+        db.query(Chunk.chunk_id)
+        .filter(Chunk.file_id == file_id)
+        .yield_per(500)
+    )
+    tasks = [enqueue_chunk_vectorization.s(str(chunk_id)) for (chunk_id,) in chunk_ids]
+    if tasks:
+        group(tasks).apply_async()
+    return len(tasks)
+
+
 # =====================================================================
 # 📄 OCR + Chunker 7.0 (PDF)
 # =====================================================================
 
-def process_pdf_with_smart_ocr(file_path: str, file_id, db: Session) -> int:
+def process_pdf_with_smart_ocr(
+    file_path: str,
+    file_id,
+    db: Session,
+) -> Tuple[int, List[str], Dict[int, str]]:
+    """
+    Постраничный Smart OCR.
+    Возвращает (chunks_created, layer_texts, ocr_texts):
+    - layer_texts — text-layer каждой страницы как есть (и у слабых тоже);
+    - ocr_texts — {страница: текст OCR} для страниц, которые ушли в Tesseract.
+    Fallback берёт их отсюда, не открывая PDF и не гоняя OCR повторно.
+    flush/commit — на вызывающем.
+    """
     file_id = ensure_uuid(file_id)
     if not file_id:
-        return 0
+        return 0, [], {}
 
     chunks_created = 0
-
-    reader = PdfReader(file_path)
-    total_pages = len(reader.pages)
-    logger.info(f"📖 SMART OCR 7.0: страниц={total_pages}")
-
-    for i, page in enumerate(reader.pages, start=1):
+    rows: List[Dict[str, Any]] = []
+
+    layer_texts: List[str] = []
+    ocr_pages: List[int] = []
+    # номера слабых страниц: text-layer (producer) → OCR (consumer);
+    # None — конец потока
+    weak_pages: "queue.Queue[Optional[int]]" = queue.Queue()
+    # DPI крупноформатных слабых страниц — пишется до weak_pages.put
+    page_dpi: Dict[int, int] = {}
+    scan_error: List[BaseException] = []
+
+    # 1) text-layer — по порядку, в отдельном потоке: OCR слабых страниц
+    #    стартует, не дожидаясь разбора всего PDF
+    def scan_text_layer():
         try:
-            text = page.extract_text() or ""
-            text = _normalize_text(text)
-
-            if not text or len(text) < 50:
-                logger.info(f"[SMART OCR] стр {i}: мало текста → Tesseract")
-                text = run_tesseract_ocr(
-                    file_path=file_path,
-                    page_num=i,
-                    use_preprocessing=True,
-                ) or ""
-                text = _normalize_text(text)
-
-            if not text.strip():
+            with open_pdf_reader(file_path) as reader:
+                logger.info(f"📖 SMART OCR 7.0: страниц={pdf_page_count(reader)}")
+
+                for i, page in enumerate(reader.pages, start=1):
+                    try:
+                        text = _normalize_text(page.extract_text() or "")
+                    except Exception as e:
+                        logger.error(f"❌ SMART OCR 7.0 ошибка text-layer стр {i}: {e}", exc_info=True)
+                        text = ""
+
+                    layer_texts.append(text)
+                    if not text or len(text) < 50:
+                        logger.info(f"[SMART OCR] стр {i}: мало текста → Tesseract")
+                        ocr_pages.append(i)
+                        i_dpi = page_ocr_dpi(page, 300)
+                        if i_dpi != 300:
+                            page_dpi[i] = i_dpi
+                        weak_pages.put(i)
+        except BaseException as e:
+            scan_error.append(e)
+        finally:
+            weak_pages.put(None)
+
+    producer = threading.Thread(target=scan_text_layer, name="smart-ocr-text-layer", daemon=True)
+    producer.start()
+
+    # 2) Tesseract для слабых страниц — параллельно, по мере их появления
+    ocr_texts = ocr_pdf_pages(
+        file_path,
+        iter(weak_pages.get, None),
+        dpi=300,
+        use_preprocessing=True,
+        page_dpi=page_dpi,
+    )
+    producer.join()
+
+    if scan_error:
+        raise scan_error[0]
+
+    ocr_texts = {i: _normalize_text(ocr_texts.get(i, "")) for i in ocr_pages}
+    page_texts = [ocr_texts.get(i, t) for i, t in enumerate(layer_texts, start=1)]
+
+    # 3) чанкинг и запись — строго в порядке страниц
+    for i, text in enumerate(page_texts, start=1):
+        try:
+            if not has_enough_text(text):
                 logger.warning(f"[SMART OCR] стр {i}: текста нет после OCR")
                 continue
 
             section = detect_section(text)
-            page_chunks = advanced_page_chunker(text, page_num=i)
+            page_chunks = advanced_page_chunker(text, page_num=i, normalized=True)
 
-            for idx, ch in enumerate(page_chunks, start=1):
+            chunk_ids = _uuid_block(len(page_chunks))
+            for idx, (ch, chunk_id) in enumerate(zip(page_chunks, chunk_ids), start=1):
                 chunk_text = ch["text"]
                 evidence = build_evidence_payload(
                     chunk_text,
@@ -383,48 +521,81 @@ def process_pdf_with_smart_ocr(file_path: str, file_id, db: Session) -> int:
                     paragraph_index=idx,
                 )
 
-                chunk = Chunk(
-                    chunk_id=uuid.uuid4(),
-                    file_id=file_id,
-                    page=i,
-                    start_offset=ch["start"],
-                    end_offset=ch["end"],
-                    text=chunk_text,
-                    evidence=evidence,
-                )
-                db.add(chunk)
+                rows.append({
+                    "chunk_id": chunk_id,
+                    "file_id": file_id,
+                    "page": i,
+                    "start_offset": ch["start"],
+                    "end_offset": ch["end"],
+                    "text": chunk_text,
+                    "evidence": evidence,
+                })
                 chunks_created += 1
 
-                enqueue_chunk_vectorization.delay(str(chunk.chunk_id))
+                if len(rows) >= CHUNK_INSERT_BATCH:
+                    _save_chunk_rows(db, rows)
 
         except Exception as e:
             logger.error(f"❌ SMART OCR 7.0 ошибка стр {i}: {e}", exc_info=True)
             continue
 
-    db.flush()
+    _save_chunk_rows(db, rows)
     logger.info(f"SMART OCR 7.0 → создано чанков: {chunks_created}")
-    return chunks_created
+    return chunks_created, layer_texts, ocr_texts
 
 
 # =====================================================================
 # 📄 Fallback OCR
 # =====================================================================
 
-def process_pdf_with_ocr(file_path: str, file_id, db: Session) -> int:
+def process_pdf_with_ocr(
+    file_path: str,
+    file_id,
+    db: Session,
+    layer_texts: Optional[List[str]] = None,
+    ocr_texts: Optional[Dict[int, str]] = None,
+) -> int:
+    """
+    Fallback OCR по всему документу.
+    Если переданы результаты Smart OCR (layer_texts, ocr_texts), PDF заново
+    не разбираем и не OCR-им — все слабые страницы Tesseract уже видел:
+    - text-layer целиком от 200 символов → берём его (как extract_text_from_pdf),
+      даже если каждая страница по отдельности короткая;
+    - иначе — OCR слабых страниц, а где OCR пуст — их text-layer.
+    flush/commit — на вызывающем.
+    """
     file_id = ensure_uuid(file_id)
     if not file_id:
         return 0
 
-    full_text = extract_text_from_pdf(file_path, dpi=300, use_preprocessing=True)
+    if layer_texts is not None:
+        ocr_texts = ocr_texts or {}
+        full_text = _normalize_text(
+            "\n\n".join(t for t in layer_texts if has_enough_text(t))
+        )
+        if len(full_text) < 200:
+            pieces: List[str] = []
+            for i, text in enumerate(layer_texts, start=1):
+                ocr_text = ocr_texts.get(i)
+                if has_enough_text(ocr_text):
+                    text = ocr_text
+                if has_enough_text(text):
+                    pieces.append(text)
+            full_text = "\n\n".join(pieces)
+    else:
+        full_text = extract_text_from_pdf(file_path, dpi=300, use_preprocessing=True)
+
     full_text = _normalize_text(full_text)
 
-    if not full_text.strip():
+    if not has_enough_text(full_text):
         return 0
 
-    page_chunks = advanced_page_chunker(full_text, page_num=1)
+    page_chunks = advanced_page_chunker(full_text, page_num=1, normalized=True)
     chunks_created = 0
+    rows: List[Dict[str, Any]] = []
 
-    for idx, ch in enumerate(page_chunks, start=1):
+    chunk_ids = _uuid_block(len(page_chunks))
+    for idx, (ch, chunk_id) in enumerate(zip(page_chunks, chunk_ids), start=1):
         chunk_text = ch["text"]
         evidence = build_evidence_payload(
             chunk_text,
@@ -433,21 +604,21 @@ def process_pdf_with_ocr(file_path: str, file_id, db: Session) -> int:
             paragraph_index=idx,
         )
 
-        chunk = Chunk(
-            chunk_id=uuid.uuid4(),
-            file_id=file_id,
-            page=idx,
-            start_offset=ch["start"],
-            end_offset=ch["end"],
-            text=chunk_text,
-            evidence=evidence,
-        )
-        db.add(chunk)
+        rows.append({
+            "chunk_id": chunk_id,
+            "file_id": file_id,
+            "page": idx,
+            "start_offset": ch["start"],
+            "end_offset": ch["end"],
+            "text": chunk_text,
+            "evidence": evidence,
+        })
         chunks_created += 1
 
-        enqueue_chunk_vectorization.delay(str(chunk.chunk_id))
+        if len(rows) >= CHUNK_INSERT_BATCH:
+            _save_chunk_rows(db, rows)
 
-    db.flush()
+    _save_chunk_rows(db, rows)
     logger.info(f"📄 Fallback OCR 7.0: создано {chunks_created} чанков")
     return chunks_created
 
@@ -463,6 +634,10 @@ def process_text_into_chunks(
     min_len: int = 50,
     page_start: int = 1,
 ) -> int:
+    """
+    Текст DOCX/TXT (или уже готовый текст PDF) → чанки в PostgreSQL.
+    flush/commit — на вызывающем.
+    """
     file_id = ensure_uuid(file_id)
     if not file_id:
         return 0
@@ -471,10 +646,12 @@ def process_text_into_chunks(
     if not norm:
         return 0
 
-    page_chunks = advanced_page_chunker(norm, page_num=page_start)
+    page_chunks = advanced_page_chunker(norm, page_num=page_start, normalized=True)
     chunks_created = 0
+    rows: List[Dict[str, Any]] = []
 
-    for idx, ch in enumerate(page_chunks, start=page_start):
+    chunk_ids = _uuid_block(len(page_chunks))
+    for idx, (ch, chunk_id) in enumerate(zip(page_chunks, chunk_ids), start=page_start):
         chunk_text = ch["text"]
 
         if len(chunk_text) < min_len and len(page_chunks) > 1:
@@ -487,21 +664,21 @@ def process_text_into_chunks(
             paragraph_index=idx,
         )
 
-        chunk = Chunk(
-            chunk_id=uuid.uuid4(),
-            file_id=file_id,
-            page=idx,
-            start_offset=ch["start"],
-            end_offset=ch["end"],
-            text=chunk_text,
-            evidence=evidence,
-        )
-        db.add(chunk)
+        rows.append({
+            "chunk_id": chunk_id,
+            "file_id": file_id,
+            "page": idx,
+            "start_offset": ch["start"],
+            "end_offset": ch["end"],
+            "text": chunk_text,
+            "evidence": evidence,
+        })
         chunks_created += 1
 
-        enqueue_chunk_vectorization.delay(str(chunk.chunk_id))
+        if len(rows) >= CHUNK_INSERT_BATCH:
+            _save_chunk_rows(db, rows)
 
-    db.flush()
+    _save_chunk_rows(db, rows)
     logger.info(f"process_text_into_chunks 7.0: {chunks_created} чанков")
     return chunks_created
 
@@ -511,21 +688,35 @@ def process_text_into_chunks(
 # =====================================================================
 
 def process_any_file(file_path: str, file_id, db: Session) -> int:
+    # file_id проверяем один раз: дальше уходит готовый UUID,
+    # и ensure_uuid во внутренних функциях срабатывает по isinstance
+    file_id = ensure_uuid(file_id)
+    if not file_id:
+        return 0
+
     ext = os.path.splitext(file_path)[1].lower()
 
     if ext == ".pdf":
-        c = process_pdf_with_smart_ocr(file_path, file_id, db)
-        return c if c > 0 else process_pdf_with_ocr(file_path, file_id, db)
+        c, layer_texts, ocr_texts = process_pdf_with_smart_ocr(file_path, file_id, db)
+        if c == 0:
+            c = process_pdf_with_ocr(
+                file_path, file_id, db, layer_texts=layer_texts, ocr_texts=ocr_texts
+            )
 
     elif ext in [".docx", ".txt"]:
         text = extract_text_from_file(file_path) or ""
-        if not text.strip():
+        if not has_enough_text(text):
             logger.warning(f"⚠️ Не удалось извлечь текст из {file_path} ({ext}), пропускаем.")
             return 0
-        return process_text_into_chunks(file_id, text, db)
+        c = process_text_into_chunks(file_id, text, db)
 
-    logger.warning(f"Unsupported file type: {ext}")
-    return 0
+    else:
+        logger.warning(f"Unsupported file type: {ext}")
+        return 0
+
+    # один flush на файл (процессоры сами не flush'ат)
+    db.flush()
+    return c
 
 
 # =====================================================================
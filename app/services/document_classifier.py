@@ -4,6 +4,49 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+_PROTO_RE = re.compile(r"протокол\s+допроса")
+
+# Правила по имени файла в порядке приоритета (первое сработавшее — побеждает).
+# "screenshot" — служебная метка, дальше уточняется на чат/кошелёк.
+FILENAME_RULES = [
+    ("protocol_interrogation", ("протокол_допроса", "протокол допроса", "допрос_потерпевшего", "допрос потерпевшего")),
+    ("victim_statement", ("заявление", "объяснение", "жалоба", "обращение")),
+    ("raport", ("рапорт",)),
+    ("resolution", ("постановление",)),
+    ("bank_statement", ("выписка", "statement", "bank")),
+    ("contract", ("договор", "расписка", "contract")),
+    ("expert_opinion", ("заключение эксперта", "экспертиза", "экспертное заключение")),
+    ("screenshot", ("screenshot", "скрин", "screen")),
+]
+
+_FILENAME_KW_PRIORITY = {}
+for _prio, (_label, _kws) in enumerate(FILENAME_RULES):
+    for _kw in _kws:
+        _FILENAME_KW_PRIORITY.setdefault(_kw, _prio)
+
+# Один проход по имени файла вместо десятков `sub in fn`.
+# Lookahead даёт совпадения с каждой позиции (в т.ч. перекрывающиеся),
+# альтернативы отсортированы по приоритету — на позиции побеждает старшее правило.
+_FILENAME_RE = re.compile(
+    "(?=("
+    + "|".join(
+        re.escape(kw)
+        for kw in sorted(_FILENAME_KW_PRIORITY, key=lambda k: (_FILENAME_KW_PRIORITY[k], -len(k)))
+    )
+    + "))"
+)
+
+
+def _match_filename_rule(fn: str) -> Optional[str]:
+    best = len(FILENAME_RULES)
+    for m in _FILENAME_RE.finditer(fn):
+        prio = _FILENAME_KW_PRIORITY[m.group(1)]
+        if prio < best:
+            best = prio
+            if best == 0:
+                break
+    return FILENAME_RULES[best][0] if best < len(FILENAME_RULES) else None
+
 
 # Возможные типы документов (можно расширять)
 DOCUMENT_TYPES = [
@@ -41,41 +84,19 @@ def classify_document(
     """
 
     fn = filename.lower()
-    text = (text_hint or "").lower()
+    # text_hint бывает целым OCR-текстом: lower() по нему дороже всех
+    # проверок имени файла, поэтому считаем его только когда он нужен
+    text: Optional[str] = None
 
     # -------------------------------
     # 1) По имени файла
     # -------------------------------
-    # Протокол допроса
-    if any(sub in fn for sub in ["протокол_допроса", "протокол допроса", "допрос_потерпевшего", "допрос потерпевшего"]):
-        return "protocol_interrogation"
-
-    # Заявление / объяснение / жалоба
-    if any(sub in fn for sub in ["заявление", "объяснение", "жалоба", "обращение"]):
-        return "victim_statement"
-
-    # Рапорт
-    if "рапорт" in fn:
-        return "raport"
-
-    # Постановление
-    if "постановление" in fn:
-        return "resolution"
-
-    # Банковская выписка
-    if any(sub in fn for sub in ["выписка", "statement", "bank"]):
-        return "bank_statement"
-
-    # Договор / расписка
-    if any(sub in fn for sub in ["договор", "расписка", "contract"]):
-        return "contract"
-
-    # Экспертное заключение
-    if any(sub in fn for sub in ["заключение эксперта", "экспертиза", "экспертное заключение"]):
-        return "expert_opinion"
+    # Протокол, заявление, рапорт, постановление, выписка, договор,
+    # экспертиза, скриншоты — см. FILENAME_RULES
+    label = _match_filename_rule(fn)
 
     # Скриншоты чатов / кабинетов / кошельков
-    if any(sub in fn for sub in ["screenshot", "скрин", "screen"]):
+    if label == "screenshot":
         # попытаемся грубо разделить чат/кошелёк
         if any(sub in fn for sub in ["chat", "whatsapp", "telegram", "ватсап", "телеграм"]):
             return "chat_screenshot"
@@ -84,10 +105,14 @@ def classify_document(
         # неизвестный скриншот
         return "other_evidence"
 
+    if label:
+        return label
+
     # Если по имени не сработало — смотрим content_type
     if content_type:
         ct = content_type.lower()
         if "image" in ct:
+            text = (text_hint or "").lower()
             # пробуем по имени/тексту определить, чат это или кошелёк
             if any(sub in fn for sub in ["chat", "whatsapp", "telegram"]) or "чат" in text:
                 return "chat_screenshot"
@@ -104,9 +129,12 @@ def classify_document(
     # -------------------------------
     # 2) По содержимому (если есть text_hint)
     # -------------------------------
+    if text is None:
+        text = (text_hint or "").lower()
+
     if text:
-        # Протокол допроса
-        if re.search(r"протокол\s+допроса", text) or "допрошен" in text:
+        # Протокол допроса (дешёвые substring-проверки раньше регулярки)
+        if "допрошен" in text or ("протокол" in text and _PROTO_RE.search(text)):
             return "protocol_interrogation"
 
         # Заявление
@@ -3,9 +3,20 @@ import logging
 from typing import List
 
 from app.search.vector_client import get_vector_client
+from app.utils.config import settings
 
 logger = logging.getLogger("EMBEDDINGS")
 
+# сколько near_text-запросов склеиваем в один GraphQL (alias q0..qN)
+EMBED_BATCH_SIZE = int(getattr(settings, "EMBED_BATCH_SIZE", 32) or 32)
+
+
+def _vector_from_hits(hits) -> List[float]:
+    if not hits:
+        return []
+    additional = hits[0].get("_additional", {}) or {}
+    return additional.get("vector") or []
+
 
 def embed_text(text: str) -> List[float]:
     """
@@ -28,7 +39,8 @@ def embed_text(text: str) -> List[float]:
     try:
         vc = get_vector_client()
 
-        result = vc.search(query_text=text, limit=1, with_vector=True)
+        # нужен только вектор — тексты чанков в ответе не запрашиваем
+        result = vc.search(query_text=text, limit=1, with_vector=True, properties=[])
         # Ожидаем структуру вида:
         # {"data": {"Get": {"Chunk": [ { "_additional": {"vector": [...]} , ... } ] } } }
         hits = (
@@ -63,18 +75,44 @@ def embed_text(text: str) -> List[float]:
 
 def embed_batch(texts: List[str]) -> List[List[float]]:
     """
-    Батч-обёртка над embed_text.
-    НЕ оптимальна по производительности (делает N запросов), но проста
-    и достаточна для отладки / небольших объёмов.
+    Батч-версия embed_text: near_text-запросы склеиваются по EMBED_BATCH_SIZE
+    в один GraphQL-запрос (multi_get с alias), вместо N round-trip'ов.
+    Если батч-запрос не удался — fallback на embed_text по одному.
     """
-    vectors: List[List[float]] = []
+    vectors: List[List[float]] = [[] for _ in texts]
+
+    todo = [(i, (t or "").strip()) for i, t in enumerate(texts)]
+    todo = [(i, t) for i, t in todo if t]
+    if not todo:
+        return vectors
+
+    try:
+        vc = get_vector_client()
+    except Exception as e:
+        logger.error(f"[embed_batch ERROR] {e}")
+        return vectors
+
+    for start in range(0, len(todo), EMBED_BATCH_SIZE):
+        part = todo[start:start + EMBED_BATCH_SIZE]
 
-    for t in texts:
         try:
-            vec = embed_text(t)
-            vectors.append(vec)
+            result = vc.search_many(
+                [t for _, t in part], limit=1, with_vector=True, properties=[]
+            )
+            if result.get("errors"):
+                raise RuntimeError(result["errors"])
+            got = result.get("data", {}).get("Get", {}) or {}
         except Exception as e:
-            logger.error(f"[embed_batch ERROR] text='{t[:30]}...' : {e}")
-            vectors.append([])
+            logger.warning(f"[embed_batch] batch-запрос не удался, по одному: {e}")
+            got = None
+
+        for k, (i, t) in enumerate(part):
+            if got is None:
+                try:
+                    vectors[i] = embed_text(t)
+                except Exception as e:
+                    logger.error(f"[embed_batch ERROR] text='{t[:30]}...' : {e}")
+                continue
+            vectors[i] = _vector_from_hits(got.get(f"q{k}"))
 
     return vectors
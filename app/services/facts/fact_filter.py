@@ -1,6 +1,8 @@
 # app/services/facts/fact_filter.py
 
+import heapq
 import logging
+import re
 from typing import List
 from app.services.facts.fact_models import LegalFact
 
@@ -87,6 +89,9 @@ class FactFilter:
         "направлено в суд",
     ]
 
+    # все процессуальные фразы — одной регуляркой (один проход по тексту)
+    _PROCESSUAL_RE = re.compile("|".join(re.escape(kw) for kw in PROCESSUAL_KEYWORDS))
+
     # ================================
     # Криминальные токены (сигналы содержания)
     # ================================
@@ -131,6 +136,55 @@ class FactFilter:
         "entity_reference",
     }
 
+    # ================================
+    # Ролевая иерархия (приоритизация)
+    # ================================
+    ROLE_SCORES = {
+        "suspect_action": 130,
+        "fraud_action": 125,
+        "fraud_event": 120,
+        "investment_event": 110,
+        "investment_context": 105,
+        "scheme_marker": 105,
+        "crypto_operation": 100,
+        "economic_action": 95,
+        "digital_transfer": 90,
+        "victim_loss": 90,
+        "money_transfer": 90,
+
+        "entity_reference": 60,
+        "admin_action": 60,
+        "victim_statement": 35,
+        "role_statement": 25,
+        "generic_fact": 15,
+    }
+
+    # ================================
+    # Веса токенов (приоритизация)
+    # ================================
+    TOKEN_SCORES = {
+        "amount": 20,
+        "fraud_flag": 22,
+        "invest_flag": 20,
+        "scheme_flag": 18,
+        "economic_flag": 16,
+        "crypto_flag": 18,
+        "crypto": 20,
+        "channel": 14,
+        "account": 14,
+
+        "project": 16,
+        "platform": 16,
+        "organization": 14,
+        "entity": 14,
+
+        "date": 5,
+        "phone": 4,
+        "article_ref": 6,
+        "person": 2,
+        "address": 1,
+    }
+
     MAX_FACTS = 180
 
     # =======================================================
@@ -159,13 +213,11 @@ class FactFilter:
             logger.warning(
                 "⚠️ FactFilter 10.2: всё отфильтровано. Возвращаем top-контент из исходных."
             )
-            return sorted(facts, key=self._score_fact, reverse=True)[: self.MAX_FACTS]
+            return heapq.nlargest(self.MAX_FACTS, facts, key=self._score_fact)
 
-        # 2. сортировка по приоритету
-        sorted_facts = sorted(non_proc, key=self._score_fact, reverse=True)
-
-        # 3. ограничение
-        return sorted_facts[: self.MAX_FACTS]
+        # 2-3. top-MAX_FACTS по приоритету (== sorted(..., reverse=True)[:N],
+        #      без полной сортировки всего списка)
+        return heapq.nlargest(self.MAX_FACTS, non_proc, key=self._score_fact)
 
     # =======================================================
     # 1. Фильтр шумовых pseudo-person предложений
@@ -209,24 +261,20 @@ class FactFilter:
         if role in self.ALWAYS_KEEP_ROLES:
             return False
 
-        text = (fact.text or fact.span_text or "").lower()
         tokens = fact.tokens or []
         token_types = {t.type for t in tokens}
 
+        # есть криминальное содержание → это не процессуалка
+        if not token_types.isdisjoint(self.CRIME_TOKEN_TYPES):
+            return False
+
         # 1) процессуальный флаг без криминального содержания
         if "processual_flag" in token_types:
-            if not token_types.intersection(self.CRIME_TOKEN_TYPES):
-                return True
-            return False
+            return True
 
         # 2) текст содержит процессуальные фразы
-        if any(kw in text for kw in self.PROCESSUAL_KEYWORDS):
-            # но в тексте нет криминального содержания → процессуалка
-            if not token_types.intersection(self.CRIME_TOKEN_TYPES):
-                return True
-            return False
-
-        return False
+        text = (fact.text or fact.span_text or "").lower()
+        return self._PROCESSUAL_RE.search(text) is not None
 
     # =======================================================
     # 3. Приоритизация фактов
@@ -236,57 +284,12 @@ class FactFilter:
         tokens = fact.tokens or []
         token_types = {t.type for t in tokens}
 
-        score = 0
-
-        # РОЛЕВАЯ ИЕРАРХИЯ
-        ROLE_SCORES = {
-            "suspect_action": 130,
-            "fraud_action": 125,
-            "fraud_event": 120,
-            "investment_event": 110,
-            "investment_context": 105,
-            "scheme_marker": 105,
-            "crypto_operation": 100,
-            "economic_action": 95,
-            "digital_transfer": 90,
-            "victim_loss": 90,
-            "money_transfer": 90,
-
-            "entity_reference": 60,
-            "admin_action": 60,
-            "victim_statement": 35,
-            "role_statement": 25,
-            "generic_fact": 15,
-        }
-
-        score += ROLE_SCORES.get(role, 10)
+        # ролевая иерархия
+        score = self.ROLE_SCORES.get(role, 10)
 
         # токены
-        TOKEN_SCORES = {
-            "amount": 20,
-            "fraud_flag": 22,
-            "invest_flag": 20,
-            "scheme_flag": 18,
-            "economic_flag": 16,
-            "crypto_flag": 18,
-            "crypto": 20,
-            "channel": 14,
-            "account": 14,
-
-            "project": 16,
-            "platform": 16,
-            "organization": 14,
-            "entity": 14,
-
-            "date": 5,
-            "phone": 4,
-            "article_ref": 6,
-            "person": 2,
-            "address": 1,
-        }
-
         for t in token_types:
-            score += TOKEN_SCORES.get(t, 1)
+            score += self.TOKEN_SCORES.get(t, 1)
 
         # confidence
         conf = getattr(fact, "confidence", 0.0) or 0.0
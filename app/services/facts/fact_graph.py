@@ -42,39 +42,46 @@ class FactGraph:
             return []
 
         unique_map: Dict[Tuple, LegalFact] = {}
+        # множества source_refs / токенов / hints копим инкрементально по ключу,
+        # списки в existing пересобираем один раз в конце, а не на каждом merge
+        merge_state: Dict[Tuple, Tuple[Set, Set, Set]] = {}
+        normalize_span = self._normalize_span
 
         for f in facts:
             tokens_key = tuple(sorted((t.type, t.value) for t in f.tokens))
-            span_key = self._normalize_span(f.span_text)
+            span_key = normalize_span(f.span_text)
             sent_key = f.sentence_index
 
             merge_key = (tokens_key, span_key, sent_key)
 
-            if merge_key not in unique_map:
+            existing = unique_map.get(merge_key)
+            if existing is None:
                 unique_map[merge_key] = f
                 continue
 
-            existing = unique_map[merge_key]
+            state = merge_state.get(merge_key)
+            if state is None:
+                state = (
+                    {(s.file_id, s.page) for s in existing.source_refs},
+                    {(t.type, t.value) for t in existing.tokens},
+                    set(existing.article_hints or []),
+                )
+                merge_state[merge_key] = state
+            src_seen, tok_seen, hints = state
 
             # ------------------------------------------------------
             # 1) объединяем source_refs
             # ------------------------------------------------------
-            old_src = {(s.file_id, s.page) for s in existing.source_refs}
-            new_src = {(s.file_id, s.page) for s in f.source_refs}
-            combined = old_src | new_src
-
-            existing.source_refs = [
-                SourceRef(file_id=fid, page=pg) for fid, pg in combined
-            ]
+            src_seen.update((s.file_id, s.page) for s in f.source_refs)
 
             # ------------------------------------------------------
             # 2) объединяем токены (не допускаем дубликатов)
             # ------------------------------------------------------
-            seen = {(t.type, t.value) for t in existing.tokens}
             for t in f.tokens:
-                if (t.type, t.value) not in seen:
+                key = (t.type, t.value)
+                if key not in tok_seen:
                     existing.tokens.append(t)
-                    seen.add((t.type, t.value))
+                    tok_seen.add(key)
 
             # ------------------------------------------------------
             # 3) оставляем span_text как у existing (главного)
@@ -84,8 +91,14 @@ class FactGraph:
             # ------------------------------------------------------
             # 4) объединяем article_hints
             # ------------------------------------------------------
-            hints = set(existing.article_hints or []) | set(f.article_hints or [])
-            existing.article_hints = list(sorted(hints))
+            hints.update(f.article_hints or [])
+
+        for merge_key, (src_seen, _, hints) in merge_state.items():
+            existing = unique_map[merge_key]
+            existing.source_refs = [
+                SourceRef(file_id=fid, page=pg) for fid, pg in src_seen
+            ]
+            existing.article_hints = sorted(hints)
 
         return list(unique_map.values())
 
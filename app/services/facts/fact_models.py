@@ -1,10 +1,32 @@
 from __future__ import annotations
 from pydantic import BaseModel, Field
 from typing import List, Optional, Tuple
-import uuid
+import os
 import datetime
 
 
+def _uuid4_str() -> str:
+    """
+    Строка UUID4 того же вида, что str(uuid.uuid4()), но без промежуточного
+    объекта uuid.UUID — токены и факты создаются тысячами на документ.
+    """
+    h = os.urandom(16).hex()
+    return (
+        f"{h[:8]}-{h[8:12]}-4{h[13:16]}-"
+        f"{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+    )
+
+
+def uuid4_strs(n: int) -> List[str]:
+    """n строк UUID4 из одного вызова os.urandom (токены одного предложения)."""
+    h = os.urandom(16 * n).hex()
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-4{h[i + 13:i + 16]}-"
+        f"{'89ab'[int(h[i + 16], 16) & 3]}{h[i + 17:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, 32 * n, 32)
+    ]
+
+
 # ================================================================
 # 📘 SourceRef — источник факта (файл, страница, позиция)
 # ================================================================
@@ -13,16 +35,29 @@ class SourceRef(BaseModel):
     page: int
     span: Optional[Tuple[int, int]] = None  # (start_char, end_char)
 
+    def as_dict(self) -> dict:
+        """То же, что model_dump(), но без обхода схемы pydantic."""
+        return {"file_id": self.file_id, "page": self.page, "span": self.span}
+
 
 # ================================================================
 # 📘 FactToken — атомарная единица (тот самый token)
 # ================================================================
 class FactToken(BaseModel):
-    token_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    token_id: str = Field(default_factory=_uuid4_str)
     type: str                    # amount / action / date / person / org / ...
     value: str                   # буквальная строка
     source: SourceRef            # откуда извлечено (file_id/page/span)
 
+    def as_dict(self) -> dict:
+        """То же, что model_dump(), но без обхода схемы pydantic."""
+        return {
+            "token_id": self.token_id,
+            "type": self.type,
+            "value": self.value,
+            "source": self.source.as_dict(),
+        }
+
     class Config:
         extra = "forbid"
 
@@ -31,7 +66,7 @@ class FactToken(BaseModel):
 # 📘 LegalFact — крупная структура, объединяющая токены
 # ================================================================
 class LegalFact(BaseModel):
-    fact_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    fact_id: str = Field(default_factory=_uuid4_str)
 
     # главный текст факта
     text: Optional[str] = None   # ← ЭТО КРИТИЧЕСКОЕ ПОЛЕ
@@ -81,8 +116,8 @@ class LegalFact(BaseModel):
         return {
             "fact_id": self.fact_id,
             "role": self.role,
-            "tokens": [t.model_dump() for t in self.tokens],
-            "source_refs": [s.model_dump() for s in self.source_refs],
+            "tokens": [t.as_dict() for t in self.tokens],
+            "source_refs": [s.as_dict() for s in self.source_refs],
             "span_text": self.span_text,
             "sentence_index": self.sentence_index,
             "context_before": self.context_before,
@@ -4,40 +4,67 @@
 # PostgreSQL-only ingest + Celery async vectorization
 # =====================================================================
 
+import io
 import os
+import re
 import uuid
 import magic
+import shutil
 import logging
 from datetime import datetime
+from typing import BinaryIO, Union
 from sqlalchemy.orm import Session
 
-from app.db.models import File, Chunk
-from app.storage.s3_client import upload_to_s3
+from app.db.models import File
+from app.storage.s3_client import upload_file_to_s3
 
 from app.services.ocr_worker import extract_text_from_pdf, run_tesseract_ocr
 from app.services.ocr_corrector import correct_ocr_text
 from app.services.parser import extract_text_from_file
-from app.services.chunker import process_text_into_chunks
+from app.services.chunker import process_text_into_chunks, enqueue_file_vectorization
 from app.utils.config import settings
 
-# Celery async indexing
-from app.tasks.vector_tasks import enqueue_chunk_vectorization
-
 logger = logging.getLogger("INGEST7")
 
+# libmagic определяет тип по началу файла — весь upload ему не нужен
+MIME_SNIFF_BYTES = 8192
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# libmagic грузит базу сигнатур при создании Magic — один экземпляр на процесс
+# (from_buffer внутри под собственным lock, потокобезопасно)
+_MIME = magic.Magic(mime=True)
+
+
+def _sniff_mime(head: bytes, filename: str) -> str:
+    """
+    MIME по сигнатуре первых байт: PDF и ZIP/DOCX узнаём без libmagic.
+    Остальное (txt, картинки, редкие форматы) — libmagic на том же префиксе.
+    """
+    if head[:5] == b"%PDF-":
+        return "application/pdf"
+    if head[:4] == b"PK\x03\x04":
+        if filename.lower().endswith(".docx"):
+            return DOCX_MIME
+        return "application/zip"
+    return _MIME.from_buffer(head)
+
 
 # =====================================================================
 # NORMALIZATION
 # =====================================================================
 
+_SPACES_RE = re.compile(r"[ \t]+")
+_NEWLINES_RE = re.compile(r"\n{3,}")
+
+
 def normalize_text(text: str) -> str:
-    import re
     if not text:
         return ""
 
     text = text.replace("\r", "")
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _SPACES_RE.sub(" ", text)
+    text = _NEWLINES_RE.sub("\n\n", text)
     return text.strip()
 
 
@@ -73,7 +100,8 @@ def process_any_file(file_path: str, file_id, db: Session) -> int:
     NOTE:
     - ZERO Weaviate calls here
     - chunker saves ONLY to PostgreSQL
-    - We then schedule Celery tasks for vector indexing
+    - one db.flush() per file here; commit is up to the caller
+    - Celery vector tasks: enqueue_file_vectorization() AFTER the caller's commit
     """
 
     ext = os.path.splitext(file_path)[1].lower()
@@ -86,11 +114,14 @@ def process_any_file(file_path: str, file_id, db: Session) -> int:
 
         if not raw_text or len(raw_text.strip()) < 50:
             logger.warning("⚠ PDF layer weak → fallback Tesseract full OCR")
-            raw_text = run_tesseract_ocr(file_path, page_num=None)
+            # page_num=None рендерил весь PDF ради первой страницы
+            raw_text = run_tesseract_ocr(file_path, page_num=1)
 
         cleaned = unified_pipeline(raw_text)
 
-        return process_text_into_chunks(file_id=file_id, text=cleaned, db=db)
+        chunks_created = process_text_into_chunks(file_id=file_id, text=cleaned, db=db)
+        db.flush()
+        return chunks_created
 
     # ------------------------- DOCX/TXT ---------------------------
     elif ext in [".docx", ".txt"]:
@@ -98,12 +129,16 @@ def process_any_file(file_path: str, file_id, db: Session) -> int:
 
         raw_text = extract_text_from_file(file_path) or ""
 
+        # PDF-OCR по docx/txt ничего не найдёт, только зря потратит время
         if not raw_text.strip():
-            raw_text = extract_text_from_pdf(file_path)
+            logger.warning(f"⚠ {ext}: текст не извлечён — файл пропущен")
+            return 0
 
         cleaned = unified_pipeline(raw_text)
 
-        return process_text_into_chunks(file_id=file_id, text=cleaned, db=db)
+        chunks_created = process_text_into_chunks(file_id=file_id, text=cleaned, db=db)
+        db.flush()
+        return chunks_created
 
     # ------------------------- UNSUPPORTED -------------------------
     else:
@@ -115,24 +150,49 @@ def process_any_file(file_path: str, file_id, db: Session) -> int:
 # INGEST DOCUMENT (main entrypoint)
 # =====================================================================
 
-def ingest_document(file_bytes: bytes, filename: str, db: Session, uploader=None, case_id=None):
+def ingest_document(
+    file_bytes: Union[bytes, BinaryIO],
+    filename: str,
+    db: Session,
+    uploader=None,
+    case_id=None,
+):
     """
-    UPLOAD → S3 → DB(File) → TEMP FILE → INGEST (OCR → CORRECT → CHUNKER) → PostgreSQL
+    UPLOAD → TEMP FILE → S3 → DB(File) → INGEST (OCR → CORRECT → CHUNKER) → PostgreSQL
     AND THEN:
     create Celery tasks for vector indexing in Weaviate
+
+    file_bytes — байты или seekable file-like (например, UploadFile.file):
+    поток копируется на диск блоками, в S3 уходит с диска, целиком в RAM
+    файл не держим.
     """
 
     logger.info(f"📥 INGEST START: {filename}")
 
-    # MIME TYPE
-    content_type = magic.Magic(mime=True).from_buffer(file_bytes)
+    stream = io.BytesIO(file_bytes) if isinstance(file_bytes, (bytes, bytearray)) else file_bytes
 
-    # Upload to S3
-    s3_key = upload_to_s3(file_bytes, filename)
+    # MIME TYPE — по первым килобайтам
+    head = stream.read(MIME_SNIFF_BYTES)
+    stream.seek(0)
+    content_type = _sniff_mime(head, filename)
 
-    # Create File record
     file_id = uuid.uuid4()
 
+    # Save temp file
+    os.makedirs(settings.TEMP_DIR, exist_ok=True)
+    temp_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{filename}")
+
+    with open(temp_path, "wb") as f:
+        shutil.copyfileobj(stream, f)
+
+    # Upload to S3
+    try:
+        s3_key = upload_file_to_s3(temp_path, filename)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+    # Create File record
     file_obj = File(
         file_id=file_id,
         filename=filename,
@@ -142,42 +202,31 @@ def ingest_document(file_bytes: bytes, filename: str, db: Session, uploader=None
         received_at=datetime.utcnow(),
         metadata={"content_type": content_type},
     )
-    db.add(file_obj)
-    db.commit()
-    db.refresh(file_obj)
-
-    # Save temp file
-    os.makedirs(settings.TEMP_DIR, exist_ok=True)
-    temp_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{filename}")
-
-    with open(temp_path, "wb") as f:
-        f.write(file_bytes)
 
     # Run ingest
     try:
+        # File и чанки — одной транзакцией: flush отправляет INSERT файла
+        # (нужен FK для bulk-вставки чанков), commit — один, после чанкера
+        db.add(file_obj)
+        db.flush()
+
         chunks_created = process_any_file(
             file_path=temp_path,
             file_id=file_id,
             db=db
         )
+        db.commit()
 
         # -----------------------------
         # AFTER INGEST → CREATE TASKS
         # -----------------------------
+        # только после commit: воркеры видят закоммиченные чанки
         logger.info(f"🔄 Creating Celery vector tasks for chunks (file_id={file_id})")
-
-        chunk_records = (
-            db.query(Chunk.chunk_id)
-            .filter(Chunk.file_id == file_id)
-            .all()
-        )
-
-        for (chunk_id,) in chunk_records:
-            enqueue_chunk_vectorization.delay(str(chunk_id))
-
-        logger.info(f"🚀 Celery tasks created: {len(chunk_records)}")
+        tasks_created = enqueue_file_vectorization(db, file_id)
+        logger.info(f"🚀 Celery tasks created: {tasks_created}")
 
     except Exception as e:
+        db.rollback()
         logger.error(f"❌ INGEST ERROR: {e}", exc_info=True)
         raise
 
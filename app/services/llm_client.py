@@ -1,13 +1,97 @@
 # app/services/llm_client.py
+import json
+import time
+import threading
+from contextlib import contextmanager
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from app.utils.config import settings
 
+# параллельные вызовы (OCR-корректор, агенты) держат keep-alive соединения
+LLM_POOL_SIZE = int(getattr(settings, "LLM_POOL_SIZE", 32) or 32)
+
+# лимит на процесс: пулы потоков создаются на каждый вызов (корректор,
+# страницы OCR, параллельные ingest'ы), поэтому общий потолок — здесь.
+# Не больше LLM_MAX_IN_FLIGHT запросов одновременно и не чаще одного
+# старта в LLM_MIN_INTERVAL_MS. Слот держится на одну попытку: паузы
+# перед повтором 429/5xx (chat) идут вне слота; внутри — только быстрые
+# повторы сбоя соединения адаптером
+LLM_MAX_IN_FLIGHT = int(getattr(settings, "LLM_MAX_IN_FLIGHT", 8) or 8)
+LLM_MIN_INTERVAL = float(getattr(settings, "LLM_MIN_INTERVAL_MS", 50) or 0) / 1000.0
+
+_slots = threading.BoundedSemaphore(LLM_MAX_IN_FLIGHT)
+_gap_lock = threading.Lock()
+_next_start = 0.0
+
+
+@contextmanager
+def llm_slot():
+    """
+    Слот на один LLM-запрос: ждёт свободного места под LLM_MAX_IN_FLIGHT,
+    затем выдерживает минимальный интервал от старта предыдущего запроса.
+    """
+    global _next_start
+    with _slots:
+        if LLM_MIN_INTERVAL > 0:
+            with _gap_lock:
+                now = time.monotonic()
+                start = max(now, _next_start)
+                _next_start = start + LLM_MIN_INTERVAL
+            if start > now:
+                time.sleep(start - now)
+        yield
+
+
+# 429/5xx: до MAX_RETRY_ATTEMPTS повторов с экспоненциальной паузой
+# (Retry-After от шлюза учитывается, но не дольше RETRY_MAX_DELAY)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_BACKOFF = 0.5
+RETRY_MAX_DELAY = 60.0
+
+
+def _retry_delay(response, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), RETRY_MAX_DELAY)
+        except ValueError:
+            pass  # HTTP-date — берём обычную паузу
+    return min(RETRY_BACKOFF * (2 ** attempt), RETRY_MAX_DELAY)
+
 
 class LLMClient:
     def __init__(self):
         self.api_url = settings.LLM_API_URL.rstrip("/")  # путь берём как есть
         self.api_key = settings.LLM_API_KEY
 
+        # одна сессия на клиент: TCP/TLS-handshake не на каждый запрос.
+        # Адаптер повторяет только сбой соединения (до MAX_RETRY_ATTEMPTS,
+        # запрос до шлюза не дошёл). Read timeout / обрыв после отправки —
+        # без повтора (read=0, other=0): генерация могла идти, а каждый
+        # повтор — ещё один платный вызов и до LLM_TIMEOUT ожидания.
+        # 429/5xx повторяет chat() — вне слота llm_slot
+        retry = Retry(
+            total=settings.MAX_RETRY_ATTEMPTS,
+            connect=settings.MAX_RETRY_ATTEMPTS,
+            read=0,
+            other=0,
+            backoff_factor=0.5,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=LLM_POOL_SIZE,
+            pool_maxsize=LLM_POOL_SIZE,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # заголовки не меняются между запросами — задаём сессии один раз
+        self.session.headers["Authorization"] = f"Bearer {self.api_key}"
+        self.session.headers["Content-Type"] = "application/json; charset=utf-8"
+
     def chat(self, messages, temperature=None):
         """
         messages = [{"role": "system"/"user"/"assistant", "content": "..."}]
@@ -24,12 +108,19 @@ class LLMClient:
             )
         }
 
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-
         url = self.api_url  # никаких добавлений снизу!
 
         try:
-            r = requests.post(url, json=payload, headers=headers, timeout=settings.LLM_TIMEOUT)
+            # кириллица как есть (UTF-8, 2 байта), а не \uXXXX (6 байт):
+            # тело втрое меньше и кодируется быстрее
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            for attempt in range(settings.MAX_RETRY_ATTEMPTS + 1):
+                # слот — на одну попытку: пауза перед повтором его не держит
+                with llm_slot():
+                    r = self.session.post(url, data=body, timeout=settings.LLM_TIMEOUT)
+                if r.status_code not in RETRY_STATUSES or attempt == settings.MAX_RETRY_ATTEMPTS:
+                    break
+                time.sleep(_retry_delay(r, attempt))
             r.raise_for_status()
             data = r.json()
             return data["choices"][0]["message"]["content"]
@@ -2,8 +2,68 @@ import logging
 import re
 from typing import Dict, Any, List, Optional
 
+from app.utils.config import settings
+
 logger = logging.getLogger(__name__)
 
+# метаданные (даты, номера КУИ/ЕРДР, шапка документа) — в начале текста;
+# регулярки и определение языка гоняем только по этому префиксу
+METADATA_SCAN_LIMIT = int(getattr(settings, "METADATA_SCAN_LIMIT", 32768) or 32768)
+
+
+# ==========================
+# ШАБЛОНЫ (компилируются один раз при импорте)
+# ==========================
+
+_CASE_NUMBER_RE = re.compile(r"(\d{9,})")
+
+_DATE_PATTERNS = [
+    re.compile(r"\b(\d{2}[./-]\d{2}[./-]\d{4})\b"),  # 12.03.2024 / 12-03-2024
+    re.compile(
+        r"\b(\d{1,2}\s+"
+        r"(января|февраля|марта|апреля|мая|июня|июля|августа|сентября|октября|ноября|декабря)"
+        r"\s+\d{4}\s*г(?:ода)?)",
+        re.IGNORECASE,
+    ),
+]
+
+_KUI_PATTERNS = [
+    re.compile(r"КУИ\s*№\s*([0-9\-]+)", re.IGNORECASE),
+    re.compile(r"КУИ\s*No\.?\s*([0-9\-]+)", re.IGNORECASE),
+]
+_ERDR_PATTERNS = [
+    re.compile(r"ЕРДР\s*№\s*([0-9\-]+)", re.IGNORECASE),
+    re.compile(r"Е[РР]Д[РР]\s*№\s*([0-9\-]+)", re.IGNORECASE),
+]
+_GENERIC_DOC_NUM_PATTERNS = [
+    re.compile(r"№\s*([0-9]{6,})"),
+]
+
+# шаблон типа "Иванов И.И." или "Иванов Иван Иванович"
+_FIO_RE = re.compile(
+    r"\b([А-ЯЁ][а-яё]+(?:\s+[А-ЯЁ][а-яё]+){0,2}\s*(?:[А-ЯЁ]\.[А-ЯЁ]\.)?)\b"
+)
+
+_AMOUNT_RE = re.compile(
+    r"\b\d{1,3}(?:[ \u00A0]\d{3})*(?:[.,]\d+)?\s*(?:тенге|тг|₸|руб(?:лей|\.?)?|₽|usd|\$|usdt)\b",
+    re.IGNORECASE,
+)
+
+# Примеры: KZ..., 16-20 цифр подряд, USDT адреса (очень грубо)
+_ACCOUNT_RE = re.compile(r"\bKZ[0-9A-Z]{10,}\b")
+_CARD_RE = re.compile(r"\b\d{4}[ \-]?\d{4}[ \-]?\d{4}[ \-]?\d{4}\b")
+
+# для языка важно только наличие букв алфавита, не их число.
+# Диапазон A-z (как и раньше) включает ещё [\]^_`
+_DIGIT_RE = re.compile(r"\d")
+
+_CYRILLIC_RE = re.compile("[А-яЁёІіҒғҚқҢңҰұҮүҺһӨөӘә]")
+_LATIN_RE = re.compile("[A-z]")
+
+# маркеры — обычные слова без спецсимволов: lower() текста один раз и
+# подстрочный поиск в C быстрее и regex-альтернации, и re.search на маркер
+_CONTENT_MARKERS = ("протокол допроса", "рапорт", "постановление", "заявление", "выписка", "договор")
+
 
 # ==========================
 # ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
@@ -14,15 +74,17 @@ def _detect_language(text: str) -> Optional[str]:
     if not text:
         return None
 
-    cyrillic = sum(1 for ch in text if "А" <= ch <= "я" or ch in "ЁёІіҒғҚқҢңҰұҮүҺһӨөӘә")
-    latin = sum(1 for ch in text if "A" <= ch <= "z")
+    # search останавливается на первой найденной букве — без обхода
+    # всего текста в Python
+    cyrillic = _CYRILLIC_RE.search(text) is not None
+    latin = _LATIN_RE.search(text) is not None
 
-    if cyrillic > 0 and latin == 0:
+    if cyrillic and not latin:
         # рус / каз — не делим, просто 'cyrillic'
         return "cyrillic"
-    if latin > 0 and cyrillic == 0:
+    if latin and not cyrillic:
         return "latin"
-    if cyrillic > 0 and latin > 0:
+    if cyrillic and latin:
         return "mixed"
 
     return None
@@ -37,14 +99,13 @@ def _extract_first_match(patterns: List[re.Pattern], text: str) -> Optional[str]
 
 
 def _extract_all_matches(pattern: re.Pattern, text: str, max_items: int = 10) -> List[str]:
-    results = []
+    # dict — уникальность за O(1) с сохранением порядка первых вхождений
+    results: Dict[str, None] = {}
     for m in pattern.finditer(text):
-        val = m.group(0)
-        if val not in results:
-            results.append(val)
+        results[m.group(0)] = None
         if len(results) >= max_items:
             break
-    return results
+    return list(results)
 
 
 # ==========================
@@ -65,6 +126,9 @@ def extract_metadata(
     - по первым байтам файла (если это текст)
     - по text_hint (если его передали выше по пайплайну)
 
+    Текст анализируется только в пределах первых METADATA_SCAN_LIMIT
+    символов (по умолчанию 32 КБ).
+
     НЕ вызывает LLM, не делает OCR.
     """
     metadata: Dict[str, Any] = {}
@@ -77,7 +141,7 @@ def extract_metadata(
     metadata["filename"] = filename
 
     # Простейшее извлечение case_id / больших номеров из имени файла
-    case_id_match = re.search(r"(\d{9,})", fn_lower)
+    case_id_match = _CASE_NUMBER_RE.search(fn_lower)
     if case_id_match:
         metadata.setdefault("possible_numbers", [])
         num = case_id_match.group(1)
@@ -107,7 +171,7 @@ def extract_metadata(
         return metadata
 
     # объединяем в один текст для простых regex
-    merged_text = "\n".join(text_sources)
+    merged_text = "\n".join(text_sources)[:METADATA_SCAN_LIMIT]
 
     # -----------------------------------------
     # 3) Язык
@@ -116,82 +180,52 @@ def extract_metadata(
     if lang:
         metadata["language"] = lang
 
+    # регулярки ниже привязаны к цифрам или к словам-якорям: если якоря
+    # в тексте нет, полный проход шаблоном заведомо ничего не найдёт
+    merged_lower = merged_text.lower()
+    has_digit = _DIGIT_RE.search(merged_text) is not None
+
     # -----------------------------------------
     # 4) Даты документа
     # -----------------------------------------
-    date_patterns = [
-        re.compile(r"\b(\d{2}[./-]\d{2}[./-]\d{4})\b"),  # 12.03.2024 / 12-03-2024
-        re.compile(
-            r"\b(\d{1,2}\s+"
-            r"(января|февраля|марта|апреля|мая|июня|июля|августа|сентября|октября|ноября|декабря)"
-            r"\s+\d{4}\s*г(?:ода)?)",
-            re.IGNORECASE,
-        ),
-    ]
-
-    doc_date = _extract_first_match(date_patterns, merged_text)
+    doc_date = _extract_first_match(_DATE_PATTERNS, merged_text) if has_digit else None
     if doc_date:
         metadata["document_date"] = doc_date
 
     # -----------------------------------------
     # 5) Номера КУИ / ЕРДР / прочие
     # -----------------------------------------
-    kui_patterns = [
-        re.compile(r"КУИ\s*№\s*([0-9\-]+)", re.IGNORECASE),
-        re.compile(r"КУИ\s*No\.?\s*([0-9\-]+)", re.IGNORECASE),
-    ]
-    erdr_patterns = [
-        re.compile(r"ЕРДР\s*№\s*([0-9\-]+)", re.IGNORECASE),
-        re.compile(r"Е[РР]Д[РР]\s*№\s*([0-9\-]+)", re.IGNORECASE),
-    ]
-    generic_doc_num_patterns = [
-        re.compile(r"№\s*([0-9]{6,})"),
-    ]
-
-    kui_number = _extract_first_match(kui_patterns, merged_text)
+    kui_number = _extract_first_match(_KUI_PATTERNS, merged_text) if "куи" in merged_lower else None
     if kui_number:
         metadata["kui_number"] = kui_number
 
-    erdr_number = _extract_first_match(erdr_patterns, merged_text)
+    erdr_number = _extract_first_match(_ERDR_PATTERNS, merged_text) if "ердр" in merged_lower else None
     if erdr_number:
         metadata["erdr_number"] = erdr_number
 
-    doc_number = _extract_first_match(generic_doc_num_patterns, merged_text)
+    doc_number = _extract_first_match(_GENERIC_DOC_NUM_PATTERNS, merged_text) if "№" in merged_text else None
     if doc_number and "document_number" not in metadata:
         metadata["document_number"] = doc_number
 
     # -----------------------------------------
     # 6) Возможные ФИО (очень грубо)
     # -----------------------------------------
-    # шаблон типа "Иванов И.И." или "Иванов Иван Иванович"
-    fio_pattern = re.compile(
-        r"\b([А-ЯЁ][а-яё]+(?:\s+[А-ЯЁ][а-яё]+){0,2}\s*(?:[А-ЯЁ]\.[А-ЯЁ]\.)?)\b"
-    )
-
-    persons = _extract_all_matches(fio_pattern, merged_text, max_items=20)
+    persons = _extract_all_matches(_FIO_RE, merged_text, max_items=20)
     if persons:
         metadata["possible_persons"] = persons
 
     # -----------------------------------------
     # 7) Возможные суммы (тенге / руб / $ / USDT)
     # -----------------------------------------
-    amount_pattern = re.compile(
-        r"\b\d{1,3}(?:[ \u00A0]\d{3})*(?:[.,]\d+)?\s*(?:тенге|тг|₸|руб(?:лей|\.?)?|₽|usd|\$|usdt)\b",
-        re.IGNORECASE,
-    )
-    amounts = _extract_all_matches(amount_pattern, merged_text, max_items=20)
+    amounts = _extract_all_matches(_AMOUNT_RE, merged_text, max_items=20) if has_digit else []
     if amounts:
         metadata["possible_amounts"] = amounts
 
     # -----------------------------------------
     # 8) Возможные счета / карты / кошельки
     # -----------------------------------------
-    # Примеры: KZ..., 16-20 цифр подряд, USDT адреса (очень грубо)
-    account_pattern = re.compile(r"\bKZ[0-9A-Z]{10,}\b")
-    card_pattern = re.compile(r"\b\d{4}[ \-]?\d{4}[ \-]?\d{4}[ \-]?\d{4}\b")
-
-    accounts = _extract_all_matches(account_pattern, merged_text, max_items=20)
-    cards = _extract_all_matches(card_pattern, merged_text, max_items=20)
+    accounts = _extract_all_matches(_ACCOUNT_RE, merged_text, max_items=20)
+    cards = _extract_all_matches(_CARD_RE, merged_text, max_items=20) if has_digit else []
 
     if accounts:
         metadata["possible_accounts"] = accounts
@@ -201,10 +235,7 @@ def extract_metadata(
     # -----------------------------------------
     # 9) Типовые маркеры документа (подсказка для document_classifier)
     # -----------------------------------------
-    markers = []
-    for kw in ["протокол допроса", "рапорт", "постановление", "заявление", "выписка", "договор"]:
-        if re.search(kw, merged_text, re.IGNORECASE):
-            markers.append(kw)
+    markers = [kw for kw in _CONTENT_MARKERS if kw in merged_lower]
     if markers:
         metadata["content_markers"] = markers
 
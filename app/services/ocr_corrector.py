@@ -1,14 +1,66 @@
 # app/services/ocr_corrector.py
+import os
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 import re
 
 from app.services.llm_client import LLMClient
+from app.services.text_cache import TextCache
+from app.utils.config import settings
 
 logger = logging.getLogger("OCR_CORRECTOR")
 
 llm_client = LLMClient()
 
+# чанки независимы — столько LLM-запросов держим в полёте одновременно
+LLM_CONCURRENCY = int(getattr(settings, "LLM_CONCURRENCY", 4) or 1)
+
+SYSTEM_PROMPT = (
+    "Ты работаешь в режиме STRICT OCR-CORRECTOR для юридических документов.\n"
+    "ТВОЯ ЗАДАЧА:\n"
+    "1) Исправлять только OCR-ошибки: перепутанные буквы, разорванные/слипшиеся слова.\n"
+    "2) Не менять смысл, факты, суммы, даты, имена, номера дел.\n"
+    "3) Не добавлять новых фраз.\n"
+    "4) Не переформулировать стилистически.\n"
+    "5) Сохранять структуру: абзацы, списки, нумерация.\n"
+    "6) Ответ строго: только исправленный текст."
+)
+
+
+# ================================
+# Кэш исправлений
+# ================================
+# temperature=0: одинаковый чанк (шапки протоколов, типовые формулировки,
+# повторная загрузка файла) даёт тот же ответ — LLM не зовём.
+# Ключ: blake2b(модель + промпт + чанк). Хранение — TextCache, как у
+# page_text_cache: in-memory LRU и ограниченный по размеру/возрасту диск
+# OCR_CORRECTOR_CACHE_DIR. Кэшируются только успешные ответы — fallback
+# на исходный чанк нет.
+CORRECTOR_CACHE_DIR = getattr(settings, "OCR_CORRECTOR_CACHE_DIR", None) or os.path.join(
+    os.path.expanduser("~"), ".cache", "afm-ocr-corrector"
+)
+CORRECTOR_CACHE_ITEMS = int(getattr(settings, "OCR_CORRECTOR_CACHE_ITEMS", 4096) or 0)
+CORRECTOR_CACHE_DISK_MAX_MB = int(getattr(settings, "OCR_CORRECTOR_CACHE_DISK_MAX_MB", 512) or 0)
+CORRECTOR_CACHE_MAX_AGE_DAYS = int(getattr(settings, "OCR_CACHE_MAX_AGE_DAYS", 30) or 0)
+
+_cache = TextCache(
+    "OCR_CORRECTOR cache",
+    CORRECTOR_CACHE_DIR,
+    memory_items=CORRECTOR_CACHE_ITEMS,
+    disk_max_bytes=CORRECTOR_CACHE_DISK_MAX_MB * 1024 * 1024,
+    max_age_seconds=CORRECTOR_CACHE_MAX_AGE_DAYS * 86400,
+)
+
+
+def _cache_key(chunk: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in (settings.LLM_MODEL, SYSTEM_PROMPT, chunk):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
 
 # ================================
 # Разбиение текста
@@ -92,19 +144,13 @@ def _call_llm_ocr_corrector(chunk: str) -> str:
     if not chunk or not chunk.strip():
         return chunk
 
-    system_prompt = (
-        "Ты работаешь в режиме STRICT OCR-CORRECTOR для юридических документов.\n"
-        "ТВОЯ ЗАДАЧА:\n"
-        "1) Исправлять только OCR-ошибки: перепутанные буквы, разорванные/слипшиеся слова.\n"
-        "2) Не менять смысл, факты, суммы, даты, имена, номера дел.\n"
-        "3) Не добавлять новых фраз.\n"
-        "4) Не переформулировать стилистически.\n"
-        "5) Сохранять структуру: абзацы, списки, нумерация.\n"
-        "6) Ответ строго: только исправленный текст."
-    )
+    key = _cache_key(chunk)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
 
     messages = [
-        {"role": "system", "content": system_prompt},
+        {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": chunk},
     ]
 
@@ -139,6 +185,7 @@ def _call_llm_ocr_corrector(chunk: str) -> str:
             logger.warning("⚠️ OCR_CORRECTOR: слишком сильное отличие → fallback")
             return chunk
 
+        _cache.put(key, response_text)
         return response_text
 
     except Exception as e:
@@ -158,13 +205,19 @@ def correct_ocr_text(raw_text: str) -> str:
         if not chunks:
             return raw_text
 
-        corrected: List[str] = []
         total = len(chunks)
 
-        for idx, ch in enumerate(chunks, start=1):
+        def correct_chunk(idx: int, ch: str) -> str:
             logger.info(f"🧠 OCR_CORRECTOR: chunk {idx}/{total}, len={len(ch)}")
-            fixed = _call_llm_ocr_corrector(ch)
-            corrected.append(fixed)
+            return _call_llm_ocr_corrector(ch)
+
+        # время ≈ самый долгий чанк, а не сумма; map сохраняет порядок
+        workers = min(LLM_CONCURRENCY, total)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                corrected = list(pool.map(correct_chunk, range(1, total + 1), chunks))
+        else:
+            corrected = [correct_chunk(idx, ch) for idx, ch in enumerate(chunks, start=1)]
 
         result = "\n\n".join(corrected).strip()
         return result or raw_text
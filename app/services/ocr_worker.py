@@ -1,9 +1,17 @@
 # app/services/ocr_worker.py
 
 import os
+import re
+import mmap
+import hashlib
 import logging
+import tempfile
+from contextlib import contextmanager
 from io import BytesIO
-from typing import Optional, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple, Union
+from collections.abc import Collection
 
 import cv2
 import numpy as np
@@ -13,6 +21,9 @@ from PyPDF2 import PdfReader
 from PIL import Image
 
 from app.utils.config import settings
+from app.utils.process_pool import discard_process_pool, get_process_pool
+from app.services import page_text_cache
+from app.services.llm_client import llm_slot
 
 logger = logging.getLogger(__name__)
 ocr_corr_logger = logging.getLogger("OCR_CORRECTOR")
@@ -29,11 +40,64 @@ OCR_LANG = os.getenv("OCR_LANG", "rus+kaz+eng")
 OCR_OEM = 1
 PSM_CANDIDATES = [6, 4, 3]  # 6 — блок текста, 4 — колонки, 3 — авто
 
+# Сколько страниц OCR-им одновременно (Tesseract/Poppler — отдельные процессы,
+# поэтому потоков достаточно: GIL отпускается на ожидании subprocess)
+OCR_CONCURRENCY = int(getattr(settings, "OCR_CONCURRENCY", 0) or os.cpu_count() or 1)
+
+# Сколько страниц рендерим одним вызовом Poppler: первые страницы уходят
+# в Tesseract, пока рендерятся следующие
+OCR_RENDER_BATCH = int(getattr(settings, "OCR_RENDER_BATCH", 0) or OCR_CONCURRENCY)
+
+# Длинная сторона страницы в пикселях не больше A4@300dpi: для A3 и крупнее
+# DPI снижается (время Tesseract линейно по числу пикселей)
+OCR_MAX_LONG_SIDE_PX = int(getattr(settings, "OCR_MAX_LONG_SIDE_PX", 3508) or 3508)
+
+# text-layer PyPDF2 — чистый Python под GIL, потоки не помогают: длинные PDF
+# разбираем диапазонами страниц в процессах. На коротких старт пула дороже.
+PDF_TEXT_PROCESSES = int(getattr(settings, "PDF_TEXT_PROCESSES", 0) or os.cpu_count() or 1)
+PDF_TEXT_PARALLEL_MIN_PAGES = int(getattr(settings, "PDF_TEXT_PARALLEL_MIN_PAGES", 64) or 64)
+
 
 # ============================================================
 # 🔧 Вспомогательные функции
 # ============================================================
 
+def has_enough_text(text: Optional[str], min_chars: int = 1) -> bool:
+    """
+    То же, что len(text.strip()) >= min_chars, но без копии строки:
+    OCR/text-layer страницы бывают мегабайтными, а проверяются только края.
+    """
+    if not text or len(text) < min_chars:
+        return False
+
+    start, end = 0, len(text)
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return end - start >= min_chars
+
+
+_PAGE_MARK_RE = re.compile(r"-{2,}\s*Page\s*\d+\s*-{2,}", re.IGNORECASE)
+
+# каждый шаблон срезает строку от маркера до конца — одной альтернацией
+# за один проход по тексту вместо отдельного re.sub на шаблон
+_GARBAGE_PATTERNS = [
+    r"сканировано\s*с\s*помощью.*",
+    r"©\s*Все права защищены.*",
+    r"QR[- ]?код.*",
+    r"электронный документ.*",
+    r"Документ создан.*",
+    r"страница\s*\d+\s*из\s*\d+.*",
+]
+_GARBAGE_RE = re.compile(
+    "|".join(f"(?:{g})" for g in _GARBAGE_PATTERNS), re.IGNORECASE
+)
+
+_SPACES_RE = re.compile(r"[ \t]+")
+_NEWLINES_RE = re.compile(r"\n{3,}")
+
+
 def _normalize_ocr_text(text: str) -> str:
     """
     Лёгкая нормализация OCR-результата:
@@ -44,58 +108,60 @@ def _normalize_ocr_text(text: str) -> str:
         return ""
 
     t = text.replace("\r", "")
-
-    import re
-    t = re.sub(r"-{2,}\s*Page\s*\d+\s*-{2,}", "", t, flags=re.IGNORECASE)
-
-    garbage_patterns = [
-        r"сканировано\s*с\s*помощью.*",
-        r"©\s*Все права защищены.*",
-        r"QR[- ]?код.*",
-        r"электронный документ.*",
-        r"Документ создан.*",
-        r"страница\s*\d+\s*из\s*\d+.*",
-    ]
-    for g in garbage_patterns:
-        t = re.sub(g, "", t, flags=re.IGNORECASE)
-
-    t = re.sub(r"[ \t]+", " ", t)
-    t = re.sub(r"\n{3,}", "\n\n", t)
+    t = _PAGE_MARK_RE.sub("", t)
+    t = _GARBAGE_RE.sub("", t)
+    t = _SPACES_RE.sub(" ", t)
+    t = _NEWLINES_RE.sub("\n\n", t)
 
     return t.strip()
 
 
-def _preprocess_image(image: Image.Image) -> Image.Image:
+def _preprocess_image(image: Image.Image) -> Union[np.ndarray, Image.Image]:
     """
     Базовая предобработка для Standard OCR:
     - перевод в оттенки серого
     - лёгкий бинарный трешхолд
+    Возвращает ndarray (обратно в PIL не копируем — Tesseract получает
+    страницу файлом, см. _save_page_image); при ошибке — исходный image.
     """
     try:
-        img = np.array(image)
-        if len(img.shape) == 3:
+        img = np.asarray(image)
+        if img.ndim == 3:
+            # gray — свой буфер cvtColor, порог пишем прямо в него
             gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img
+            cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=gray)
+            return gray
 
         _, thresh = cv2.threshold(
-            gray,
+            img,
             0,
             255,
             cv2.THRESH_BINARY + cv2.THRESH_OTSU,
         )
-        return Image.fromarray(thresh)
+        return thresh
     except Exception as e:
         logger.warning(f"⚠️ Ошибка предобработки изображения: {e}")
         return image
 
 
+def _save_page_image(image: Union[np.ndarray, Image.Image], path: str) -> None:
+    """PNG страницы для Tesseract: ndarray — через imencode (путь может быть не ASCII)."""
+    if isinstance(image, np.ndarray):
+        ok, buf = cv2.imencode(".png", image)
+        if not ok:
+            raise ValueError("cv2.imencode не смог закодировать страницу")
+        buf.tofile(path)
+    else:
+        image.save(path)
+
+
 # ============================================================
 # 🧠 LLM-корректор для OCR (опционально)
 # ============================================================
 
 import json
 import requests
+import requests.adapters
 
 
 _OCR_CORRECTOR_ENABLED = bool(getattr(settings, "OCR_CORRECTOR_ENABLED", True))
@@ -105,6 +171,20 @@ _OCR_CORRECTOR_URL = getattr(settings, "OCR_CORRECTOR_URL", None) or getattr(
 _OCR_CORRECTOR_MODEL = getattr(settings, "OCR_CORRECTOR_MODEL", "gpt-4o-mini")
 _OCR_CORRECTOR_API_KEY = getattr(settings, "OCR_CORRECTOR_API_KEY", None)
 
+_OCR_CORRECTOR_HEADERS = {"Content-Type": "application/json; charset=utf-8"}
+if _OCR_CORRECTOR_API_KEY:
+    _OCR_CORRECTOR_HEADERS["Authorization"] = f"Bearer {_OCR_CORRECTOR_API_KEY}"
+
+# Одна keep-alive сессия на процесс: страницы корректируются параллельно
+# (OCR_CONCURRENCY потоков), без TCP/TLS-handshake на каждую страницу
+_OCR_CORRECTOR_SESSION = requests.Session()
+_OCR_CORRECTOR_SESSION.mount(
+    "http://", requests.adapters.HTTPAdapter(pool_maxsize=max(OCR_CONCURRENCY, 10))
+)
+_OCR_CORRECTOR_SESSION.mount(
+    "https://", requests.adapters.HTTPAdapter(pool_maxsize=max(OCR_CONCURRENCY, 10))
+)
+
 
 def _correct_ocr_with_llm(raw_text: str, page_num: int) -> str:
     """
@@ -149,18 +229,14 @@ def _correct_ocr_with_llm(raw_text: str, page_num: int) -> str:
             ],
         }
 
-        headers = {
-            "Content-Type": "application/json",
-        }
-        if _OCR_CORRECTOR_API_KEY:
-            headers["Authorization"] = f"Bearer {_OCR_CORRECTOR_API_KEY}"
-
-        resp = requests.post(
-            _OCR_CORRECTOR_URL.rstrip("/") + "/v1/chat/completions",
-            headers=headers,
-            data=json.dumps(payload),
-            timeout=60,
-        )
+        # общий с LLMClient лимит: страницы идут из OCR_CONCURRENCY потоков
+        with llm_slot():
+            resp = _OCR_CORRECTOR_SESSION.post(
+                _OCR_CORRECTOR_URL.rstrip("/") + "/v1/chat/completions",
+                headers=_OCR_CORRECTOR_HEADERS,
+                data=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                timeout=60,
+            )
         resp.raise_for_status()
         data = resp.json()
 
@@ -183,36 +259,86 @@ def _correct_ocr_with_llm(raw_text: str, page_num: int) -> str:
 # 🧾 OCR по Image
 # ============================================================
 
+def _ocr_params(use_preprocessing: bool) -> tuple:
+    """Всё, кроме самой картинки, от чего зависит текст страницы: часть ключа кэша."""
+    return (
+        OCR_LANG, OCR_OEM, tuple(PSM_CANDIDATES), use_preprocessing,
+        _OCR_CORRECTOR_MODEL if (_OCR_CORRECTOR_ENABLED and _OCR_CORRECTOR_URL) else None,
+    )
+
+
+def _image_cache_key(image: Union[np.ndarray, Image.Image], use_preprocessing: bool) -> Optional[str]:
+    """
+    blake2b пикселей страницы + всё, от чего зависит результат
+    (язык, OEM/PSM, предобработка, LLM-коррекция).
+    """
+    try:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr(_ocr_params(use_preprocessing)).encode("utf-8"))
+        if isinstance(image, np.ndarray):
+            data = np.ascontiguousarray(image)
+            h.update(repr((data.shape, data.dtype.str)).encode("ascii"))
+            h.update(data)
+        else:
+            h.update(repr((image.mode, image.size)).encode("ascii"))
+            h.update(image.tobytes())
+        return h.hexdigest()
+    except Exception as e:
+        logger.warning(f"⚠️ Не удалось посчитать hash страницы: {e}")
+        return None
+
+
 def run_tesseract_ocr_image(
     image: Image.Image,
     page_num: int = 1,
     use_preprocessing: bool = True,
+    use_cache: bool = True,
 ) -> str:
     """
     Запуск Tesseract по PIL.Image.
     Используется Smart-OCR и debug-эндпоинтами.
+    Результат кэшируется по содержимому страницы (page_text_cache);
+    use_cache=False — распознать заново.
     """
     if use_preprocessing:
         image = _preprocess_image(image)
 
-    for psm in PSM_CANDIDATES:
-        try:
-            config = f"--oem {OCR_OEM} --psm {psm}"
-            text = pytesseract.image_to_string(
-                image,
-                lang=OCR_LANG,
-                config=config,
-            )
-            text = _normalize_ocr_text(text)
-            logger.debug(
-                f"OCR(page): стр.{page_num}, PSM={psm}, len={len(text)}"
-            )
+    ikey = _image_cache_key(image, use_preprocessing) if use_cache else None
+    if ikey:
+        cached = page_text_cache.get(ikey)
+        if cached is not None:
+            return cached
 
-            if len(text.strip()) > 30:
-                corrected = _correct_ocr_with_llm(text, page_num)
-                return corrected or text
+    # pytesseract на каждый вызов заново пишет картинку во временный файл.
+    # При переборе PSM кодируем страницу один раз и отдаём Tesseract путь.
+    with tempfile.TemporaryDirectory(prefix="afm_tess_") as tmp_dir:
+        src = os.path.join(tmp_dir, f"page_{page_num}.png")
+        try:
+            _save_page_image(image, src)
         except Exception as e:
-            logger.error(f"❌ Tesseract error page={page_num}, PSM={psm}: {e}")
+            logger.error(f"❌ Не удалось подготовить стр.{page_num} для Tesseract: {e}")
+            return ""
+
+        for psm in PSM_CANDIDATES:
+            try:
+                config = f"--oem {OCR_OEM} --psm {psm}"
+                text = pytesseract.image_to_string(
+                    src,
+                    lang=OCR_LANG,
+                    config=config,
+                )
+                text = _normalize_ocr_text(text)
+                logger.debug(
+                    f"OCR(page): стр.{page_num}, PSM={psm}, len={len(text)}"
+                )
+
+                if has_enough_text(text, 31):
+                    corrected = _correct_ocr_with_llm(text, page_num) or text
+                    if ikey:
+                        page_text_cache.put(ikey, corrected)
+                    return corrected
+            except Exception as e:
+                logger.error(f"❌ Tesseract error page={page_num}, PSM={psm}: {e}")
 
     return ""
 
@@ -252,18 +378,246 @@ def run_tesseract_ocr(
         return ""
 
 
+# ============================================================
+# 📄 OCR набора страниц PDF (один вызов Poppler)
+# ============================================================
+
+def page_ocr_dpi(page, dpi: int = 300) -> int:
+    """
+    DPI рендера страницы: не выше dpi и такой, чтобы длинная сторона
+    была не больше OCR_MAX_LONG_SIDE_PX. Размер — из mediabox (пункты, 1/72").
+    """
+    try:
+        box = page.mediabox
+        long_side_in = max(float(box.width), float(box.height)) / 72.0
+    except Exception:
+        return dpi
+    if long_side_in <= 0:
+        return dpi
+    return max(72, min(dpi, int(OCR_MAX_LONG_SIDE_PX / long_side_in)))
+
+
+def _page_runs(
+    pages: Iterable[int],
+    max_len: Optional[int] = None,
+    key: Optional[Dict[int, int]] = None,
+) -> Iterator[Tuple[int, int]]:
+    """
+    1, 2, 3, 7, 8 → (1, 3), (7, 8) — непрерывные диапазоны страниц.
+    Страницы идут по возрастанию; работает и на потоке (генераторе):
+    диапазон отдаётся, как только стало ясно, что он закончился
+    или достиг max_len.
+    key — {страница: значение}; диапазон рвётся и там, где значение
+    меняется (страницы с другим DPI рендерятся отдельным вызовом).
+    """
+    run: Optional[Tuple[int, int]] = None
+    run_key = None
+    for p in pages:
+        p_key = key.get(p) if key else None
+        if run and p == run[1] + 1 and p_key == run_key:
+            run = (run[0], p)
+        else:
+            if run:
+                yield run
+            run = (p, p)
+            run_key = p_key
+
+        if max_len and run[1] - run[0] + 1 >= max_len:
+            yield run
+            run = None
+
+    if run:
+        yield run
+
+
+def _page_cache_key(fhash: str, page_num: int, dpi: int, use_preprocessing: bool) -> str:
+    """Ключ страницы файла: hash файла, страница, DPI рендера и параметры OCR."""
+    params = (fhash, page_num, dpi) + _ocr_params(use_preprocessing)
+    return hashlib.blake2b(repr(params).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _ocr_page_file(path: str, page_num: int, use_preprocessing: bool) -> str:
+    try:
+        with Image.open(path) as image:
+            # кэш — на уровне страницы файла (ocr_pdf_pages): hash пикселей
+            # и вторая запись того же текста тут не нужны
+            return run_tesseract_ocr_image(
+                image=image,
+                page_num=page_num,
+                use_preprocessing=use_preprocessing,
+                use_cache=False,
+            ) or ""
+    except Exception as e:
+        logger.error(f"❌ Ошибка OCR page={page_num}: {e}")
+        return ""
+
+
+def ocr_pdf_pages(
+    file_path: str,
+    page_numbers: Iterable[int],
+    dpi: int = 300,
+    use_preprocessing: bool = True,
+    page_dpi: Optional[Dict[int, int]] = None,
+) -> Dict[int, str]:
+    """
+    OCR нескольких страниц PDF.
+    - непрерывные диапазоны страниц рендерятся вызовами pdftoppm
+      (по OCR_RENDER_BATCH страниц) во временную папку;
+    - страницы OCR-ятся параллельно (OCR_CONCURRENCY потоков) сразу после
+      рендера своей пачки — рендер следующих страниц идёт одновременно с OCR;
+    - уже распознанные страницы берутся из page_text_cache;
+    - page_dpi — DPI отдельных страниц вместо dpi (см. page_ocr_dpi); при
+      потоковых page_numbers запись для страницы должна появиться до неё.
+    page_numbers может быть потоком (генератор / очередь) номеров страниц
+    по возрастанию — OCR начинается, не дожидаясь его конца.
+    Возвращает {page_num: text}.
+    """
+    if isinstance(page_numbers, Collection):
+        if not page_numbers:
+            return {}
+        page_numbers = sorted(set(page_numbers))
+
+    results: Dict[int, str] = {}
+    fhash: Optional[str] = None
+    hashed = False
+    keys: Dict[int, str] = {}
+
+    def uncached_pages() -> Iterator[int]:
+        nonlocal fhash, hashed
+        for n in page_numbers:
+            if not hashed:
+                hashed = True
+                try:
+                    fhash = page_text_cache.file_hash(file_path)
+                except Exception as e:
+                    logger.warning(f"⚠️ Не удалось посчитать hash file={file_path}: {e}")
+
+            if fhash:
+                n_dpi = page_dpi.get(n, dpi) if page_dpi else dpi
+                keys[n] = _page_cache_key(fhash, n, n_dpi, use_preprocessing)
+                cached = page_text_cache.get(keys[n])
+                if cached is not None:
+                    results[n] = cached
+                    continue
+            yield n
+
+    # pool закрывается (с ожиданием OCR) раньше, чем удаляется tmp_dir;
+    # потоки пула создаются по мере submit
+    with tempfile.TemporaryDirectory(prefix="afm_ocr_") as tmp_dir, \
+            ThreadPoolExecutor(max_workers=OCR_CONCURRENCY) as pool:
+        futures: Dict[int, Future] = {}
+
+        for first, last in _page_runs(uncached_pages(), max_len=OCR_RENDER_BATCH, key=page_dpi):
+            try:
+                paths = convert_from_path(
+                    file_path,
+                    dpi=page_dpi.get(first, dpi) if page_dpi else dpi,
+                    poppler_path=POPPLER_PATH,
+                    first_page=first,
+                    last_page=last,
+                    fmt="jpeg",
+                    output_folder=tmp_dir,
+                    paths_only=True,
+                    # пачка делится между несколькими pdftoppm: первые
+                    # страницы доходят до OCR-потоков быстрее
+                    thread_count=min(OCR_CONCURRENCY, last - first + 1),
+                )
+            except Exception as e:
+                logger.error(f"❌ Ошибка рендера file={file_path}, pages={first}-{last}: {e}")
+                continue
+
+            for n, path in zip(range(first, last + 1), paths):
+                futures[n] = pool.submit(_ocr_page_file, path, n, use_preprocessing)
+
+        for n in sorted(futures):
+            text = futures[n].result()
+            results[n] = text
+            if n in keys:
+                page_text_cache.put(keys[n], text)
+
+    if results and len(results) > len(futures):
+        logger.info(f"♻️ OCR cache: {len(results) - len(futures)}/{len(results)} стр. из кэша")
+
+    return results
+
+
 # ============================================================
 # 📚 PDF text-layer → OCR fallback
 # ============================================================
 
-def _extract_pdf_text_layer(file_path: str) -> str:
+def pdf_page_count(reader: PdfReader) -> int:
+    """
+    Число страниц из /Root/Pages/Count — без разворачивания всего
+    дерева страниц (len(reader.pages) резолвит каждый PageObject).
+    """
+    try:
+        return int(reader.trailer["/Root"]["/Pages"]["/Count"])
+    except Exception:
+        return len(reader.pages)
+
+
+@contextmanager
+def open_pdf_reader(file_path: str) -> Iterator[PdfReader]:
+    """
+    PdfReader поверх mmap файла: PyPDF2 по пути читает весь PDF в BytesIO,
+    а так страницы читаются прямо из отображённого файла.
+    Объекты reader'а нельзя использовать после выхода из with.
+    """
+    with open(file_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # пустой файл / ФС без mmap — обычное чтение
+            yield PdfReader(f, strict=False)
+            return
+
+        try:
+            yield PdfReader(mm, strict=False)
+        finally:
+            mm.close()
+
+
+def _extract_text_range(file_path: str, first: int, last: int) -> List[str]:
+    """text-layer страниц first..last (с 1) — точка входа для ProcessPoolExecutor."""
+    with open_pdf_reader(file_path) as reader:
+        return [reader.pages[i].extract_text() or "" for i in range(first - 1, last)]
+
+
+def _extract_page_texts(reader: PdfReader, file_path: Optional[str]) -> List[str]:
+    """
+    Тексты всех страниц по порядку. Длинный PDF (если известен путь)
+    делится на непрерывные диапазоны, которые разбирают процессы общего
+    пула (app.utils.process_pool, spawn, создаётся один раз);
+    внутри демонических процессов (воркеры Celery) пула нет.
+    """
+    total = pdf_page_count(reader)
+    pool = None
+    if file_path and total >= PDF_TEXT_PARALLEL_MIN_PAGES:
+        pool = get_process_pool("pdf_text_layer", PDF_TEXT_PROCESSES)
+    if pool is None:
+        return [page.extract_text() or "" for page in reader.pages]
+
+    workers = min(PDF_TEXT_PROCESSES, total)
+    step = -(-total // workers)
+    firsts = list(range(1, total + 1, step))
+    lasts = [min(first + step - 1, total) for first in firsts]
+
+    texts: List[str] = []
+    try:
+        for part in pool.map(_extract_text_range, [file_path] * len(firsts), firsts, lasts):
+            texts.extend(part)
+    except BrokenProcessPool:
+        # упал дочерний процесс: пул пересоздастся при следующем вызове
+        discard_process_pool("pdf_text_layer")
+        return [page.extract_text() or "" for page in reader.pages]
+    return texts
+
+
+def _extract_pdf_text_layer(reader: PdfReader, file_path: Optional[str] = None) -> str:
     try:
-        reader = PdfReader(file_path)
-        pieces: List[str] = []
-        for page in reader.pages:
-            t = page.extract_text() or ""
-            if t.strip():
-                pieces.append(t)
+        pieces: List[str] = [
+            t for t in _extract_page_texts(reader, file_path) if has_enough_text(t)
+        ]
 
         full = "\n\n".join(pieces)
         full = _normalize_ocr_text(full)
@@ -286,28 +640,37 @@ def extract_text_from_pdf(
     dpi: int = 300,
     use_preprocessing: bool = True,
 ) -> str:
-    text_layer = _extract_pdf_text_layer(file_path)
-    if text_layer:
-        return text_layer
-
+    # один разбор PDF и для text-layer, и для числа страниц под OCR
     try:
-        reader = PdfReader(file_path)
-        total_pages = len(reader.pages)
+        with open_pdf_reader(file_path) as reader:
+            text_layer = _extract_pdf_text_layer(reader, file_path)
+            if text_layer:
+                return text_layer
+            total_pages = pdf_page_count(reader)
+            # крупноформатные страницы — с пониженным DPI
+            page_dpi = {}
+            for n, page in enumerate(reader.pages, start=1):
+                n_dpi = page_ocr_dpi(page, dpi)
+                if n_dpi != dpi:
+                    page_dpi[n] = n_dpi
     except Exception as e:
         logger.error(f"❌ Не удалось прочитать PDF для OCR: {e}")
         return ""
 
     logger.info(f"📖 OCR fallback по всему PDF, страниц={total_pages}")
 
-    all_pages: List[str] = []
-    for page_num in range(1, total_pages + 1):
-        t = run_tesseract_ocr(
-            file_path=file_path,
-            page_num=page_num,
-            use_preprocessing=use_preprocessing,
-        )
-        if t.strip():
-            all_pages.append(t)
+    # страницы независимы: рендер пачками и OCR в OCR_CONCURRENCY потоков
+    ocr_pages = ocr_pdf_pages(
+        file_path,
+        range(1, total_pages + 1),
+        dpi=dpi,
+        use_preprocessing=use_preprocessing,
+        page_dpi=page_dpi,
+    )
+
+    all_pages: List[str] = [
+        ocr_pages[n] for n in sorted(ocr_pages) if has_enough_text(ocr_pages[n])
+    ]
 
     full = "\n\n".join(all_pages)
     return _normalize_ocr_text(full)
@@ -337,18 +700,19 @@ def debug_ocr_single_page(
 def preprocess_image(image_bytes: bytes) -> Image.Image:
     """
     Подготовка изображения к OCR:
-    - grayscale
+    - grayscale (сразу при декодировании, без цветного буфера)
     - adaptive threshold
-    - лёгкая резкость
+
+    Резкость (filter2D 3×3, центр 5) раньше шла после порога, но на
+    бинарной 0/255 картинке с насыщением uint8 она ничего не меняет —
+    лишний проход по странице убран.
     """
     np_img = np.frombuffer(image_bytes, np.uint8)
-    img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
+    gray = cv2.imdecode(np_img, cv2.IMREAD_GRAYSCALE)
 
-    if img is None:
+    if gray is None:
         return Image.open(BytesIO(image_bytes))
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
     thr = cv2.adaptiveThreshold(
         gray, 255,
         cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
@@ -356,12 +720,7 @@ def preprocess_image(image_bytes: bytes) -> Image.Image:
         31, 10
     )
 
-    kernel = np.array([[0, -1, 0],
-                       [-1, 5, -1],
-                       [0, -1, 0]])
-    sharp = cv2.filter2D(thr, -1, kernel)
-
-    pil_image = Image.fromarray(sharp)
+    pil_image = Image.fromarray(thr)
     return pil_image
 
 
@@ -0,0 +1,58 @@
+# app/services/page_text_cache.py
+
+"""
+Кэш распознанного текста страниц PDF.
+
+OCR страницы — это рендер Poppler + Tesseract (+ LLM-коррекция), поэтому
+повторные прогоны того же файла (fallback, ретраи Celery, повторная загрузка)
+берут текст отсюда.
+
+Ключ — готовая строка (hex-digest), его собирает вызывающий:
+- страницы PDF (ocr_pdf_pages) — blake2b содержимого файла + номер страницы;
+- отдельные картинки (run_tesseract_ocr_image) — blake2b пикселей вместе
+  с параметрами OCR: одинаковые страницы разных файлов тоже берутся из кэша.
+Хранение — TextCache (in-memory LRU + диск OCR_CACHE_DIR, по умолчанию
+~/.cache/afm-ocr, не больше OCR_CACHE_DISK_MAX_MB и не старше
+OCR_CACHE_MAX_AGE_DAYS).
+"""
+
+import os
+import hashlib
+from typing import Optional
+
+from app.services.text_cache import TextCache
+from app.utils.config import settings
+
+CACHE_DIR = getattr(settings, "OCR_CACHE_DIR", None) or os.path.join(
+    os.path.expanduser("~"), ".cache", "afm-ocr"
+)
+MEMORY_ITEMS = int(getattr(settings, "OCR_CACHE_MEMORY_ITEMS", 2048) or 0)
+DISK_MAX_BYTES = int(getattr(settings, "OCR_CACHE_DISK_MAX_MB", 2048) or 0) * 1024 * 1024
+MAX_AGE_SECONDS = int(getattr(settings, "OCR_CACHE_MAX_AGE_DAYS", 30) or 0) * 86400
+
+_HASH_BLOCK = 1024 * 1024
+
+_cache = TextCache(
+    "page_text_cache",
+    CACHE_DIR,
+    memory_items=MEMORY_ITEMS,
+    disk_max_bytes=DISK_MAX_BYTES,
+    max_age_seconds=MAX_AGE_SECONDS,
+)
+
+
+def file_hash(file_path: str) -> str:
+    """blake2b содержимого файла (читаем блоками, без загрузки целиком)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def get(key: str) -> Optional[str]:
+    return _cache.get(key)
+
+
+def put(key: str, text: str) -> None:
+    _cache.put(key, text)
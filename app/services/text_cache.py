@@ -0,0 +1,145 @@
+# app/services/text_cache.py
+
+"""
+Кэш текста по строковому ключу: in-memory LRU + каталог на диске.
+
+Используется там, где текст дорого получать заново (OCR страниц,
+LLM-коррекция). Ключ — готовая строка (hex-digest), его собирает вызывающий.
+Уровни:
+- in-memory LRU на memory_items записей (в пределах процесса воркера);
+- диск: {directory}/{key[:2]}/{key}.txt, не больше disk_max_bytes и не старше
+  max_age_seconds: лишнее чистится по давности использования
+  (mtime, чтение его обновляет).
+Пустые результаты не кэшируем — такой текст стоит попробовать получить ещё раз.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TextCache:
+    def __init__(
+        self,
+        name: str,
+        directory: str,
+        memory_items: int,
+        disk_max_bytes: int,
+        max_age_seconds: int,
+    ):
+        self.name = name
+        self.directory = directory
+        self.memory_items = memory_items
+        self.disk_max_bytes = disk_max_bytes
+        self.max_age_seconds = max_age_seconds
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # сколько записано на диск с последней чистки; None — чистки ещё не было
+        self._written_since_prune: Optional[int] = None
+        self._prune_lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def _remember(self, key: str, text: str) -> None:
+        if self.memory_items <= 0:
+            return
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                return text
+
+        path = self._path(key)
+        try:
+            if self.max_age_seconds and time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ {self.name}: не удалось прочитать {key}: {e}")
+            return None
+
+        self._remember(key, text)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        if not text or not text.strip():
+            return
+
+        self._remember(key, text)
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"⚠️ {self.name}: не удалось записать {key}: {e}")
+            return
+
+        self._account(len(text.encode("utf-8")))
+
+    def _account(self, size: int) -> None:
+        """Чистка диска — при первой записи процесса и дальше каждые ~10% лимита."""
+        with self._prune_lock:
+            if self._written_since_prune is not None:
+                self._written_since_prune += size
+                if not self.disk_max_bytes or self._written_since_prune < self.disk_max_bytes // 10:
+                    return
+            self._written_since_prune = 0
+        self._prune()
+
+    def _prune(self) -> None:
+        """Удаляет просроченные записи, затем самые давние — до 90% disk_max_bytes."""
+        now = time.time()
+        entries = []
+        total = 0
+        for root, _dirs, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                    if self.max_age_seconds and now - st.st_mtime > self.max_age_seconds:
+                        os.remove(path)
+                        continue
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        if not self.disk_max_bytes or total <= self.disk_max_bytes:
+            return
+
+        removed = 0
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= self.disk_max_bytes * 9 // 10:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        logger.info(f"🧹 {self.name}: удалено {removed} записей, на диске {total // (1024 * 1024)} MB")
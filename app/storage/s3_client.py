@@ -1,8 +1,18 @@
 import boto3, uuid
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from app.utils.config import settings
 
 _s3 = None
+_bucket_ready = False
+
+# большие файлы — multipart: части по 8 МБ грузятся параллельно
+_MB = 1024 * 1024
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * _MB,
+    multipart_chunksize=8 * _MB,
+    max_concurrency=int(getattr(settings, "S3_UPLOAD_CONCURRENCY", 8) or 8),
+)
 
 def s3_client():
     global _s3
@@ -18,10 +28,15 @@ def s3_client():
     return _s3
 
 def ensure_bucket():
+    """Проверяем/создаём bucket один раз на процесс, а не на каждую загрузку."""
+    global _bucket_ready
+    if _bucket_ready:
+        return
     s3 = s3_client()
     buckets = [b["Name"] for b in s3.list_buckets().get("Buckets", [])]
     if settings.S3_BUCKET not in buckets:
         s3.create_bucket(Bucket=settings.S3_BUCKET)
+    _bucket_ready = True
 
 def upload_to_s3(file_bytes: bytes, filename: str) -> str:
     s3 = s3_client()
@@ -30,6 +45,14 @@ def upload_to_s3(file_bytes: bytes, filename: str) -> str:
     s3.put_object(Bucket=settings.S3_BUCKET, Key=key, Body=file_bytes)
     return key
 
+def upload_file_to_s3(file_path: str, filename: str) -> str:
+    """То же, что upload_to_s3, но с диска: boto3 читает файл частями (multipart)."""
+    s3 = s3_client()
+    ensure_bucket()
+    key = f"{uuid.uuid4()}/{filename}"
+    s3.upload_file(file_path, settings.S3_BUCKET, key, Config=_TRANSFER_CONFIG)
+    return key
+
 def get_presigned_url(key: str, expires=3600) -> str:
     s3 = s3_client()
     return s3.generate_presigned_url(
@@ -0,0 +1,48 @@
+# app/utils/process_pool.py
+
+"""
+Общие пулы процессов для CPU-тяжёлой работы под GIL
+(токенизация фактов, text-layer PyPDF2).
+
+- пул создаётся лениво, один на имя и на процесс, и живёт до выхода:
+  старт интерпретаторов и импорт app.* оплачиваются один раз, а не на вызов;
+- контекст "spawn": дочерние процессы не наследуют через fork состояние
+  многопоточного родителя (uvicorn — locks logging, пул соединений БД),
+  которое может быть захвачено другим потоком и повесить ребёнка;
+- внутри демонических процессов (воркеры Celery) пул не поднять — None.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_pools: Dict[str, ProcessPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def get_process_pool(name: str, max_workers: int) -> Optional[ProcessPoolExecutor]:
+    if max_workers <= 1 or multiprocessing.current_process().daemon:
+        return None
+
+    with _lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pools[name] = pool
+            logger.info(f"⚙️ process pool '{name}': {max_workers} процессов (spawn)")
+        return pool
+
+
+def discard_process_pool(name: str) -> None:
+    """Сломанный пул (BrokenProcessPool — упал дочерний процесс) — следующий вызов создаст новый."""
+    with _lock:
+        pool = _pools.pop(name, None)
+    if pool is not None:
+        pool.shutdown(wait=False)
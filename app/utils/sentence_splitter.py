@@ -92,6 +92,27 @@ SAFE_PATTERNS = [
 ]
 
 
+def _required_literal(pat: str):
+    """
+    Для шаблонов вида \\bтг\\. — сам литерал ("тг."). С \\b впереди re не
+    использует поиск по префиксу и идёт по тексту посимвольно, поэтому
+    сначала проверяем литерал через str.__contains__.
+    """
+    if not pat.startswith(r"\b"):
+        return None
+    lit = pat[2:].replace(r"\.", ".")
+    if any(c in lit for c in "\\[](){}?*+|^$"):
+        return None
+    return lit
+
+
+# скомпилированы один раз при импорте — сплиттер вызывается на каждую страницу
+_DATE_RES = [re.compile(p) for p in DATE_PATTERNS]
+_SAFE_RES = [(re.compile(p), _required_literal(p)) for p in SAFE_PATTERNS]
+_ENDING_RE = re.compile(r"[.!?]")
+_GARBAGE_SENT_RE = re.compile(r"[.!?,;:\-\s]+")
+
+
 # ======================================================================
 #  NORMALIZATION
 # ======================================================================
@@ -119,17 +140,27 @@ def _normalize(text: str) -> str:
 #  PROTECTOR ENGINE
 # ======================================================================
 
+def _mask_date(m: re.Match) -> str:
+    return m.group(0).replace(".", "__DOT__").replace("/", "__SLASH__")
+
+
+def _mask_dots(m: re.Match) -> str:
+    return m.group(0).replace(".", "__DOT__")
+
+
 def _protect_dates(text: str) -> str:
     """Первый этап защиты — даты."""
-    for pat in DATE_PATTERNS:
-        text = re.sub(pat, lambda m: m.group(0).replace(".", "__DOT__").replace("/", "__SLASH__"), text)
+    for rx in _DATE_RES:
+        text = rx.sub(_mask_date, text)
     return text
 
 
 def _protect_safe_tokens(text: str) -> str:
     """Второй этап защиты — сокращения, ФИО, ст.190 и т.п."""
-    for pat in SAFE_PATTERNS:
-        text = re.sub(pat, lambda m: m.group(0).replace(".", "__DOT__"), text)
+    for rx, literal in _SAFE_RES:
+        if literal is not None and literal not in text:
+            continue
+        text = rx.sub(_mask_dots, text)
     return text
 
 
@@ -191,19 +222,23 @@ def _is_sentence_boundary(text: str, idx: int) -> bool:
 # ======================================================================
 
 def _manual_split(text: str) -> List[str]:
+    """
+    Граница возможна только на .!? — проверяем лишь эти позиции
+    и режем срезами, без посимвольного буфера.
+    """
     out = []
-    buf = []
+    start = 0
 
-    for i, ch in enumerate(text):
-        buf.append(ch)
+    for m in _ENDING_RE.finditer(text):
+        i = m.start()
         if _is_sentence_boundary(text, i):
-            s = "".join(buf).strip()
+            s = text[start:i + 1].strip()
             if len(s) >= MIN_SENT_LEN:
                 out.append(s)
-            buf = []
+            start = i + 1
 
-    if buf:
-        s = "".join(buf).strip()
+    if start < len(text):
+        s = text[start:].strip()
         if len(s) >= MIN_SENT_LEN:
             out.append(s)
 
@@ -231,7 +266,7 @@ def split_into_sentences(text: str) -> List[str]:
     # Удаление мусора
     clean = [
         s for s in restored
-        if not re.fullmatch(r"[.!?,;:\-\s]+", s)
+        if not _GARBAGE_SENT_RE.fullmatch(s)
     ]
 
     logger.info(f"SentenceSplitter v15 → {len(clean)} sent")